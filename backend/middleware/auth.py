@@ -1,12 +1,40 @@
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from motor.motor_asyncio import AsyncIOMotorDatabase
 from utils.jwt_utils import decode_access_token
+from utils.ttl_cache import TTLCache
+from typing import Optional
+from services.database import get_db
+import os
 
 security = HTTPBearer()
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    from server import db
-    
+# Authenticated principals, keyed by user id. Entries are dropped explicitly
+# whenever the user document changes; the TTL only bounds staleness from
+# writes made outside this process.
+user_cache = TTLCache(
+    max_size=int(os.environ.get('USER_CACHE_MAX_SIZE', 10000)),
+    ttl_seconds=float(os.environ.get('USER_CACHE_TTL_SECONDS', 30))
+)
+
+def invalidate_user(user_id: str):
+    """Drop a cached principal after its user document was updated"""
+    user_cache.invalidate(user_id)
+
+async def load_user(db: AsyncIOMotorDatabase, user_id: str) -> Optional[dict]:
+    """Fetch a user (without password) through the principal cache"""
+    user = user_cache.get(user_id)
+    if user is None:
+        user = await db.users.find_one({"id": user_id}, {"_id": 0, "password": 0})
+        if user is None:
+            return None
+        user_cache.set(user_id, user)
+    return dict(user)
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    db: AsyncIOMotorDatabase = Depends(get_db)
+):
     token = credentials.credentials
     payload = decode_access_token(token)
     
@@ -23,7 +51,7 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
             detail="Invalid token payload"
         )
     
-    user = await db.users.find_one({"id": user_id}, {"_id": 0, "password": 0})
+    user = await load_user(db, user_id)
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
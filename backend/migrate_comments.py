@@ -0,0 +1,67 @@
+import asyncio
+import os
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReplaceOne
+from dotenv import load_dotenv
+
+load_dotenv()
+
+async def migrate_comments():
+    """Move comments embedded in issues.comments into the comments collection.
+
+    Safe to re-run, also after deploying: comments are upserted by id, the
+    embedded array is only removed after its comments have been written, and
+    comment_count is incremented rather than overwritten.
+    """
+    mongo_url = os.getenv('MONGO_URL')
+    if not mongo_url:
+        print("MONGO_URL not found in environment variables")
+        return
+
+    client = AsyncIOMotorClient(mongo_url)
+    db = client[os.getenv('DB_NAME', 'hostel_db')]
+
+    migrated_issues = 0
+    migrated_comments = 0
+    cursor = db.issues.find({"comments.0": {"$exists": True}}, {"_id": 0, "id": 1, "comments": 1})
+    async for issue in cursor:
+        comments = issue["comments"]
+        reply_counts = {}
+        for comment in comments:
+            if comment.get("parent_comment"):
+                reply_counts[comment["parent_comment"]] = reply_counts.get(comment["parent_comment"], 0) + 1
+
+        operations = []
+        for comment in comments:
+            likes = comment.get("likes", [])
+            doc = {
+                **comment,
+                "issue_id": issue["id"],
+                "likes": likes,
+                "likes_count": len(likes),
+                "reply_count": reply_counts.get(comment["id"], 0)
+            }
+            operations.append(ReplaceOne({"id": comment["id"]}, doc, upsert=True))
+
+        await db.comments.bulk_write(operations, ordered=False)
+        # Comments added since the deploy are already counted, so the embedded
+        # ones are added on top; dropping the array in the same update keeps a
+        # re-run from counting them twice
+        await db.issues.update_one(
+            {"id": issue["id"], "comments.0": {"$exists": True}},
+            {"$inc": {"comment_count": len(comments)}, "$unset": {"comments": ""}}
+        )
+        migrated_issues += 1
+        migrated_comments += len(comments)
+
+    # Issues without embedded comments still need the counter
+    await db.issues.update_many(
+        {"comment_count": {"$exists": False}},
+        {"$set": {"comment_count": 0}, "$unset": {"comments": ""}}
+    )
+
+    print(f"Migrated {migrated_comments} comments from {migrated_issues} issues")
+    client.close()
+
+if __name__ == "__main__":
+    asyncio.run(migrate_comments())
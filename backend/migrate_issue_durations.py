@@ -0,0 +1,79 @@
+import asyncio
+import os
+from datetime import datetime
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from dotenv import load_dotenv
+
+load_dotenv()
+
+BATCH_SIZE = 500
+
+def _parse(timestamp):
+    if isinstance(timestamp, datetime):
+        return timestamp
+    return datetime.fromisoformat(timestamp.replace("Z", "+00:00"))
+
+def _hours_between(start, end) -> float:
+    return (_parse(end) - _parse(start)).total_seconds() / 3600
+
+def issue_durations(issue: dict) -> dict:
+    """Fields update_issue_status would have stored, derived from status_history"""
+    history = issue.get("status_history") or []
+    reported_at = issue.get("reported_at") or (history[0]["timestamp"] if history else None)
+    # The first real transition after the "reported" entry; merges push
+    # entries that keep the status and are not a response
+    responses = [item for item in history[1:] if item.get("new_status") != item.get("old_status")]
+    if not reported_at or not responses:
+        return {}
+
+    fields = {
+        "first_response_at": responses[0]["timestamp"],
+        "response_time_hours": _hours_between(reported_at, responses[0]["timestamp"])
+    }
+    if issue.get("status") in ("Resolved", "Closed"):
+        resolved = [item for item in history if item.get("new_status") == "Resolved"]
+        if resolved:
+            fields["resolved_at"] = resolved[-1]["timestamp"]
+            fields["resolution_time_hours"] = _hours_between(reported_at, resolved[-1]["timestamp"])
+    return fields
+
+async def migrate_issue_durations():
+    """Backfill first_response_at, resolved_at and the SLA durations on existing issues.
+
+    Only issues without response_time_hours are touched, so it is safe to re-run.
+    """
+    mongo_url = os.getenv('MONGO_URL')
+    if not mongo_url:
+        print("MONGO_URL not found in environment variables")
+        return
+
+    client = AsyncIOMotorClient(mongo_url)
+    db = client[os.getenv('DB_NAME', 'hostel_db')]
+
+    updated = 0
+    operations = []
+    cursor = db.issues.find(
+        {"response_time_hours": {"$exists": False}, "status_history.1": {"$exists": True}},
+        {"_id": 0, "id": 1, "status": 1, "reported_at": 1,
+         "status_history.old_status": 1, "status_history.new_status": 1, "status_history.timestamp": 1}
+    )
+    async for issue in cursor:
+        fields = issue_durations(issue)
+        if not fields:
+            continue
+        operations.append(UpdateOne({"id": issue["id"]}, {"$set": fields}))
+        if len(operations) >= BATCH_SIZE:
+            await db.issues.bulk_write(operations, ordered=False)
+            updated += len(operations)
+            operations = []
+
+    if operations:
+        await db.issues.bulk_write(operations, ordered=False)
+        updated += len(operations)
+
+    print(f"Backfilled durations on {updated} issues")
+    client.close()
+
+if __name__ == "__main__":
+    asyncio.run(migrate_issue_durations())
@@ -0,0 +1,34 @@
+import asyncio
+import os
+from motor.motor_asyncio import AsyncIOMotorClient
+from dotenv import load_dotenv
+
+load_dotenv()
+
+ROLES = ("management", "student")
+
+async def migrate_notification_audiences():
+    """Address notifications sent to a bare role name ("management") to its role audience.
+
+    Those notifications were never shown to anyone, so they start out unread
+    for every member of the role. Safe to re-run.
+    """
+    mongo_url = os.getenv('MONGO_URL')
+    if not mongo_url:
+        print("MONGO_URL not found in environment variables")
+        return
+
+    client = AsyncIOMotorClient(mongo_url)
+    db = client[os.getenv('DB_NAME', 'hostel_db')]
+
+    for role in ROLES:
+        result = await db.notifications.update_many(
+            {"recipient": role},
+            {"$set": {"recipient": f"role:{role}", "audience": "role", "is_read": False, "read_at": None}}
+        )
+        print(f"Moved {result.modified_count} '{role}' notifications to role:{role}")
+
+    client.close()
+
+if __name__ == "__main__":
+    asyncio.run(migrate_notification_audiences())
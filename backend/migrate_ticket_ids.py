@@ -0,0 +1,42 @@
+import asyncio
+import os
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import UpdateOne
+from dotenv import load_dotenv
+
+load_dotenv()
+
+async def migrate_ticket_ids():
+    """Renumber issues that share a ticket_id so the unique ticket_id index can be built.
+
+    The oldest issue keeps its ticket ID; the others get a -2, -3, ... suffix.
+    Safe to re-run.
+    """
+    mongo_url = os.getenv('MONGO_URL')
+    if not mongo_url:
+        print("MONGO_URL not found in environment variables")
+        return
+
+    client = AsyncIOMotorClient(mongo_url)
+    db = client[os.getenv('DB_NAME', 'hostel_db')]
+
+    duplicates = db.issues.aggregate([
+        {"$sort": {"created_at": 1, "id": 1}},
+        {"$group": {"_id": "$ticket_id", "ids": {"$push": "$id"}, "count": {"$sum": 1}}},
+        {"$match": {"count": {"$gt": 1}}}
+    ], allowDiskUse=True)
+
+    operations = []
+    async for group in duplicates:
+        for suffix, issue_id in enumerate(group["ids"][1:], start=2):
+            new_ticket_id = f"{group['_id']}-{suffix}"
+            operations.append(UpdateOne({"id": issue_id}, {"$set": {"ticket_id": new_ticket_id}}))
+            print(f"{issue_id}: {group['_id']} -> {new_ticket_id}")
+
+    if operations:
+        await db.issues.bulk_write(operations, ordered=False)
+    print(f"Renumbered {len(operations)} issues")
+    client.close()
+
+if __name__ == "__main__":
+    asyncio.run(migrate_ticket_ids())
@@ -62,6 +62,14 @@ class NotificationType(str, Enum):
     ANNOUNCEMENT = "ANNOUNCEMENT"
     ESCALATION = "ESCALATION"
     REMINDER = "REMINDER"
+    GATE_PASS_REQUEST = "GATE_PASS_REQUEST"
+    GATE_PASS_UPDATE = "GATE_PASS_UPDATE"
+
+class NotificationAudience(str, Enum):
+    USER = "user"
+    ROLE = "role"
+    HOSTEL = "hostel"
+    BLOCK = "block"
 
 class NotificationCreate(BaseModel):
     recipient: str
@@ -76,13 +84,15 @@ class NotificationCreate(BaseModel):
 class NotificationResponse(BaseModel):
     id: str
     recipient: str
+    audience: NotificationAudience = NotificationAudience.USER
     type: NotificationType
     title: str
     message: str
-    related_issue: Optional[str]
-    related_announcement: Optional[str]
-    link: Optional[str]
+    related_issue: Optional[str] = None
+    related_announcement: Optional[str] = None
+    related_id: Optional[str] = None
+    link: Optional[str] = None
     is_read: bool
-    read_at: Optional[datetime]
-    priority: str
+    read_at: Optional[datetime] = None
+    priority: str = "Medium"
     created_at: datetime
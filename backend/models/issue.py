@@ -25,6 +25,8 @@ class IssueStatus(str, Enum):
     RESOLVED = "Resolved"
     CLOSED = "Closed"
 
+OPEN_STATUSES = [IssueStatus.REPORTED.value, IssueStatus.ASSIGNED.value, IssueStatus.IN_PROGRESS.value]
+
 class IssueVisibility(str, Enum):
     PUBLIC = "Public"
     PRIVATE = "Private"
@@ -50,12 +52,15 @@ class StatusHistoryItem(BaseModel):
 
 class Comment(BaseModel):
     id: str
+    issue_id: Optional[str] = None
     user_id: str
     user_name: str
     user_role: str
     text: str
     parent_comment: Optional[str] = None
-    likes: List[str] = []
+    likes_count: int = 0
+    has_liked: bool = False
+    reply_count: int = 0
     created_at: datetime = Field(default_factory=datetime.utcnow)
 
 class AIPredictions(BaseModel):
@@ -63,6 +68,8 @@ class AIPredictions(BaseModel):
     priority: Optional[str] = None
     confidence_score: Optional[float] = None
     estimated_resolution_hours: Optional[float] = None
+    status: Optional[str] = None  # pending | completed
+    source: Optional[str] = None  # model | keyword
 
 class Resolution(BaseModel):
     resolved_by: Optional[str] = None
@@ -85,10 +92,24 @@ class IssueCreate(BaseModel):
 
 class IssueUpdate(BaseModel):
     status: Optional[IssueStatus] = None
+    category: Optional[IssueCategory] = None
     assigned_to: Optional[str] = None
     priority: Optional[IssuePriority] = None
     remarks: Optional[str] = None
 
+class IssueBulkUpdateItem(IssueUpdate):
+    issue_id: str
+
+class IssueBulkUpdate(BaseModel):
+    updates: List[IssueBulkUpdateItem] = Field(..., min_length=1, max_length=200)
+
+class IssueRebalance(BaseModel):
+    hostel: Optional[str] = None
+    block: Optional[str] = None
+    category: Optional[IssueCategory] = None
+    unassigned_only: bool = False
+    limit: int = Field(500, ge=1, le=5000)
+
 class IssueResponse(BaseModel):
     id: str
     ticket_id: str
@@ -107,16 +128,54 @@ class IssueResponse(BaseModel):
     assigned_to_name: Optional[str] = None
     ai_predictions: Optional[AIPredictions] = None
     status_history: List[StatusHistoryItem] = []
-    comments: List[Comment] = []
+    comment_count: int = 0
     resolution: Optional[Resolution] = None
     feedback: Optional[Feedback] = None
     reported_at: datetime
     closed_at: Optional[datetime] = None
+    first_response_at: Optional[datetime] = None
+    resolved_at: Optional[datetime] = None
+    response_time_hours: Optional[float] = None
+    resolution_time_hours: Optional[float] = None
+    escalated_at: Optional[datetime] = None
     is_duplicate: bool = False
     merged_with: Optional[str] = None
     merged_issues: List[str] = []
     views: int = 0
     upvotes: List[str] = []
+    upvote_count: int = 0
+    created_at: datetime
+    updated_at: datetime
+
+class SimilarIssue(BaseModel):
+    id: str
+    ticket_id: str
+    title: str
+    status: str
+    similarity: float
+
+class IssueCreateResponse(IssueResponse):
+    possible_duplicates: List[SimilarIssue] = []
+
+class IssueSummary(BaseModel):
+    """Lightweight issue representation for list screens"""
+    id: str
+    ticket_id: str
+    title: str
+    description: str
+    category: IssueCategory
+    priority: IssuePriority
+    status: IssueStatus
+    visibility: IssueVisibility
+    location: Optional[Location] = None
+    reporter_id: str
+    reporter_name: str
+    assigned_to: Optional[str] = None
+    assigned_to_name: Optional[str] = None
+    comment_count: int = 0
+    upvote_count: int = 0
+    views: int = 0
+    reported_at: datetime
     created_at: datetime
     updated_at: datetime
 
@@ -43,6 +43,9 @@ class UserLogin(BaseModel):
     email: EmailStr
     password: str
 
+class UserActiveUpdate(BaseModel):
+    is_active: bool
+
 class UserResponse(BaseModel):
     id: str
     name: str
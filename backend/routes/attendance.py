@@ -2,25 +2,20 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from typing import List, Optional
 from datetime import datetime, timezone
 import uuid
-import os
 
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorDatabase
 from models.attendance import AttendanceCreate, AttendanceResponse, AttendanceStatus
+from services.database import get_db
 from middleware.auth import get_current_user, require_role
 
 router = APIRouter(prefix="/attendance", tags=["Attendance"])
 
-def get_db():
-    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
-    return client[os.environ['DB_NAME']]
-
 @router.post("/", response_model=AttendanceResponse, status_code=201)
 async def mark_attendance(
     attendance_data: AttendanceCreate,
-    current_user: dict = Depends(require_role(["management", "admin"]))
+    current_user: dict = Depends(require_role(["management", "admin"])),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
-    db = get_db()
-    
     # Verify student exists
     student = await db.users.find_one({"id": attendance_data.student_id, "role": "student"})
     if not student:
@@ -73,9 +68,9 @@ async def get_attendance(
     student_id: Optional[str] = None,
     date: Optional[datetime] = None,
     hostel: Optional[str] = None,
-    current_user: dict = Depends(require_role(["management", "admin", "student"]))
+    current_user: dict = Depends(require_role(["management", "admin", "student"])),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
-    db = get_db()
     filters = {}
     
     if current_user["role"] == "student":
@@ -100,13 +95,12 @@ async def get_attendance(
 @router.get("/stats/{student_id}")
 async def get_attendance_stats(
     student_id: str,
-    current_user: dict = Depends(require_role(["management", "admin", "student"]))
+    current_user: dict = Depends(require_role(["management", "admin", "student"])),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     if current_user["role"] == "student" and student_id != current_user["id"]:
         raise HTTPException(status_code=403, detail="Not authorized")
         
-    db = get_db()
-    
     pipeline = [
         {"$match": {"student_id": student_id}},
         {"$group": {
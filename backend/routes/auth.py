@@ -1,20 +1,17 @@
 from fastapi import APIRouter, HTTPException, status, Depends
 from models.user import UserCreate, UserLogin, UserResponse, TokenResponse
 from utils.jwt_utils import create_access_token
-from middleware.auth import get_current_user
-import bcrypt
+from middleware.auth import get_current_user, invalidate_user
+from services.database import get_db
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from utils.password import hash_password, verify_password
 from datetime import datetime, timezone
 import uuid
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
-def get_db():
-    from server import db
-    return db
-
 @router.post("/register", response_model=TokenResponse, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserCreate):
-    db = get_db()
+async def register(user_data: UserCreate, db: AsyncIOMotorDatabase = Depends(get_db)):
     existing_user = await db.users.find_one({"email": user_data.email}, {"_id": 0})
     if existing_user:
         raise HTTPException(
@@ -22,13 +19,13 @@ async def register(user_data: UserCreate):
             detail="Email already registered"
         )
     
-    hashed_password = bcrypt.hashpw(user_data.password.encode('utf-8'), bcrypt.gensalt())
+    hashed_password = await hash_password(user_data.password)
     
     user_id = str(uuid.uuid4())
     user_dict = user_data.model_dump(exclude={"password"})
     user_dict.update({
         "id": user_id,
-        "password": hashed_password.decode('utf-8'),
+        "password": hashed_password,
         "is_active": True,
         "email_verified": False,
         "created_at": datetime.now(timezone.utc).isoformat(),
@@ -63,8 +60,7 @@ async def register(user_data: UserCreate):
     return TokenResponse(access_token=access_token, user=user_response)
 
 @router.post("/login", response_model=TokenResponse)
-async def login(credentials: UserLogin):
-    db = get_db()
+async def login(credentials: UserLogin, db: AsyncIOMotorDatabase = Depends(get_db)):
     user = await db.users.find_one({"email": credentials.email}, {"_id": 0})
     
     if not user:
@@ -73,7 +69,7 @@ async def login(credentials: UserLogin):
             detail="Invalid email or password"
         )
     
-    if not bcrypt.checkpw(credentials.password.encode('utf-8'), user["password"].encode('utf-8')):
+    if not await verify_password(credentials.password, user["password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid email or password"
@@ -95,6 +91,7 @@ async def login(credentials: UserLogin):
             "$inc": {"login_count": 1}
         }
     )
+    invalidate_user(user["id"])
     
     access_token = create_access_token(
         data={"sub": user["id"], "email": user["email"], "role": user["role"]}
@@ -1,26 +1,23 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from typing import List, Optional
 from datetime import datetime, timezone
 import uuid
-import os
 
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorDatabase
 from models.gatepass import GatePassCreate, GatePassResponse, PassStatus
+from services.database import get_db
+from utils.pagination import paginate, set_cursor_headers
+from services.notifications import build_notification, notify, role_audience
 from middleware.auth import get_current_user, require_role
 
 router = APIRouter(prefix="/gatepass", tags=["Gate Pass"])
 
-def get_db():
-    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
-    return client[os.environ['DB_NAME']]
-
 @router.post("/", response_model=GatePassResponse, status_code=201)
 async def apply_gate_pass(
     pass_data: GatePassCreate,
-    current_user: dict = Depends(require_role(["student"]))
+    current_user: dict = Depends(require_role(["student"])),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
-    db = get_db()
-    
     # Check for active passes
     active_pass = await db.gate_passes.find_one({
         "student_id": current_user["id"],
@@ -55,27 +52,25 @@ async def apply_gate_pass(
     await db.gate_passes.insert_one(pass_doc)
     
     # Notify management
-    await db.notifications.insert_one({
-        "id": str(uuid.uuid4()),
-        "recipient": "management",
-        "type": "GATE_PASS_REQUEST",
-        "title": "New Gate Pass Request",
-        "message": f"{current_user['name']} requested {pass_data.type}",
-        "related_id": pass_id,
-        "link": "/management/gatepass",
-        "is_read": False,
-        "created_at": datetime.now(timezone.utc).isoformat()
-    })
+    await notify(db, [build_notification(
+        role_audience("management"), "GATE_PASS_REQUEST", "New Gate Pass Request",
+        f"{current_user['name']} requested {pass_data.type}",
+        link="/management/gatepass",
+        related_id=pass_id
+    )])
     
     return GatePassResponse(**pass_doc)
 
 @router.get("/", response_model=List[GatePassResponse])
 async def get_gate_passes(
+    response: Response,
     status: Optional[str] = None,
     student_id: Optional[str] = None,
-    current_user: dict = Depends(get_current_user)
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
-    db = get_db()
     filters = {}
     
     if current_user["role"] == "student":
@@ -86,17 +81,17 @@ async def get_gate_passes(
     if status:
         filters["status"] = status
 
-    passes = await db.gate_passes.find(filters, {"_id": 0}).sort("created_at", -1).to_list(100)
+    passes, next_cursor, prev_cursor = await paginate(db.gate_passes, filters, cursor, limit)
+    set_cursor_headers(response, next_cursor, prev_cursor)
     return [GatePassResponse(**p) for p in passes]
 
 @router.patch("/{pass_id}/status", response_model=GatePassResponse)
 async def update_pass_status(
     pass_id: str,
     status_update: dict,
-    current_user: dict = Depends(require_role(["management"]))
+    current_user: dict = Depends(require_role(["management"])),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
-    db = get_db()
-    
     gate_pass = await db.gate_passes.find_one({"id": pass_id})
     if not gate_pass:
         raise HTTPException(status_code=404, detail="Gate pass not found")
@@ -117,17 +112,12 @@ async def update_pass_status(
     await db.gate_passes.update_one({"id": pass_id}, {"$set": update_data})
     
     # Notify student
-    await db.notifications.insert_one({
-        "id": str(uuid.uuid4()),
-        "recipient": gate_pass["student_id"],
-        "type": "GATE_PASS_UPDATE",
-        "title": f"Gate Pass {status_update['status']}",
-        "message": f"Your gate pass request has been {status_update['status'].lower()}",
-        "related_id": pass_id,
-        "link": "/student/gatepass",
-        "is_read": False,
-        "created_at": datetime.now(timezone.utc).isoformat()
-    })
+    await notify(db, [build_notification(
+        gate_pass["student_id"], "GATE_PASS_UPDATE", f"Gate Pass {status_update['status']}",
+        f"Your gate pass request has been {status_update['status'].lower()}",
+        link="/student/gatepass",
+        related_id=pass_id
+    )])
     
     updated_pass = await db.gate_passes.find_one({"id": pass_id}, {"_id": 0})
     return GatePassResponse(**updated_pass)
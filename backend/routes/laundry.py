@@ -2,24 +2,20 @@ from fastapi import APIRouter, Depends, HTTPException, Body
 from typing import List, Optional
 from datetime import datetime, timezone, timedelta
 import uuid
-import os
 
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorDatabase
 from models.laundry import (LaundryMachineCreate, LaundryMachineResponse, MachineStatus)
+from services.database import get_db
 from middleware.auth import get_current_user, require_role
 
 router = APIRouter(prefix="/laundry", tags=["Laundry"])
 
-def get_db():
-    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
-    return client[os.environ['DB_NAME']]
-
 @router.post("/machines", response_model=LaundryMachineResponse, status_code=201)
 async def create_machine(
     machine_data: LaundryMachineCreate,
-    current_user: dict = Depends(require_role(["management", "admin"]))
+    current_user: dict = Depends(require_role(["management", "admin"])),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
-    db = get_db()
     machine_id = str(uuid.uuid4())
     
     machine_doc = {
@@ -37,8 +33,7 @@ async def create_machine(
     return LaundryMachineResponse(**machine_doc)
 
 @router.get("/machines", response_model=List[LaundryMachineResponse])
-async def get_machines(block: Optional[str] = None):
-    db = get_db()
+async def get_machines(block: Optional[str] = None, db: AsyncIOMotorDatabase = Depends(get_db)):
     filters = {}
     if block:
         filters["block"] = block
@@ -78,9 +73,9 @@ async def get_machines(block: Optional[str] = None):
 async def use_machine(
     machine_id: str,
     duration_minutes: int = Body(..., embed=True),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
-    db = get_db()
     machine = await db.laundry.find_one({"id": machine_id})
     
     if not machine:
@@ -110,9 +105,9 @@ async def use_machine(
 @router.post("/machines/{machine_id}/release")
 async def release_machine(
     machine_id: str,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
-    db = get_db()
     machine = await db.laundry.find_one({"id": machine_id})
     
     if not machine:
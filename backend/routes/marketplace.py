@@ -1,28 +1,24 @@
-from fastapi import APIRouter, Depends, HTTPException, Query, File, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, Query, File, UploadFile, Response
 from typing import List, Optional
 from datetime import datetime, timezone
 import uuid
-import os
 
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorDatabase
 from models.marketplace import (MarketplaceCreate, MarketplaceResponse, MarketplaceStatus, 
                                 MarketplaceCategory, MediaItem)
+from services.database import get_db
 from middleware.auth import get_current_user, require_role
 from utils.cloudinary_utils import upload_file
+from utils.pagination import paginate, set_cursor_headers
 
 router = APIRouter(prefix="/marketplace", tags=["Marketplace"])
 
-# Helper to get DB
-def get_db():
-    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
-    return client[os.environ['DB_NAME']]
-
 @router.post("/", response_model=MarketplaceResponse, status_code=201)
 async def create_listing(
     listing_data: MarketplaceCreate,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
-    db = get_db()
     listing_id = str(uuid.uuid4())
     
     listing_doc = {
@@ -47,11 +43,14 @@ async def create_listing(
 
 @router.get("/", response_model=List[MarketplaceResponse])
 async def get_listings(
+    response: Response,
     category: Optional[MarketplaceCategory] = None,
     status: Optional[MarketplaceStatus] = MarketplaceStatus.AVAILABLE,
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
-    db = get_db()
     filters = {}
     
     if status:
@@ -64,12 +63,12 @@ async def get_listings(
             {"description": {"$regex": search, "$options": "i"}}
         ]
         
-    listings = await db.marketplace.find(filters, {"_id": 0}).sort("created_at", -1).to_list(100)
+    listings, next_cursor, prev_cursor = await paginate(db.marketplace, filters, cursor, limit)
+    set_cursor_headers(response, next_cursor, prev_cursor)
     return [MarketplaceResponse(**l) for l in listings]
 
 @router.get("/{listing_id}", response_model=MarketplaceResponse)
-async def get_listing(listing_id: str):
-    db = get_db()
+async def get_listing(listing_id: str, db: AsyncIOMotorDatabase = Depends(get_db)):
     listing = await db.marketplace.find_one({"id": listing_id}, {"_id": 0})
     if not listing:
         raise HTTPException(status_code=404, detail="Listing not found")
@@ -79,9 +78,9 @@ async def get_listing(listing_id: str):
 async def update_status(
     listing_id: str,
     status: MarketplaceStatus,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
-    db = get_db()
     listing = await db.marketplace.find_one({"id": listing_id})
     if not listing:
         raise HTTPException(status_code=404, detail="Listing not found")
@@ -101,9 +100,9 @@ async def update_status(
 async def upload_listing_image(
     listing_id: str,
     file: UploadFile = File(...),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
-    db = get_db()
     listing = await db.marketplace.find_one({"id": listing_id})
     if not listing:
         raise HTTPException(status_code=404, detail="Listing not found")
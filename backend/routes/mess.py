@@ -2,26 +2,22 @@ from fastapi import APIRouter, Depends, HTTPException, Body
 from typing import List, Optional
 from datetime import datetime, timezone
 import uuid
-import os
 
-from motor.motor_asyncio import AsyncIOMotorClient
+from motor.motor_asyncio import AsyncIOMotorDatabase
 from models.mess import (MessMenuCreate, MessMenuResponse, DayOfWeek, MealType, 
                          PollCreate, PollResponse, PollOption)
+from services.database import get_db
+from utils.atomic import toggle_keyed_choice, record_single_choice
 from middleware.auth import get_current_user, require_role
 
 router = APIRouter(prefix="/mess", tags=["Mess"])
 
-def get_db():
-    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
-    return client[os.environ['DB_NAME']]
-
 @router.post("/menu", response_model=MessMenuResponse, status_code=201)
 async def create_menu_item(
     menu_data: MessMenuCreate,
-    current_user: dict = Depends(require_role(["management", "admin"]))
+    current_user: dict = Depends(require_role(["management", "admin"])),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
-    db = get_db()
-    
     # Check if menu exists for this day/meal
     existing = await db.mess_menu.find_one({
         "day": menu_data.day,
@@ -59,8 +55,7 @@ async def create_menu_item(
     return MessMenuResponse(**menu_doc)
 
 @router.get("/menu", response_model=List[MessMenuResponse])
-async def get_menu(day: Optional[DayOfWeek] = None):
-    db = get_db()
+async def get_menu(day: Optional[DayOfWeek] = None, db: AsyncIOMotorDatabase = Depends(get_db)):
     filters = {}
     if day:
         filters["day"] = day
@@ -72,60 +67,27 @@ async def get_menu(day: Optional[DayOfWeek] = None):
 async def vote_menu(
     menu_id: str,
     vote_type: str = Body(..., embed=True), # "up" or "down"
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     if vote_type not in ["up", "down"]:
         raise HTTPException(status_code=400, detail="Invalid vote type")
         
-    db = get_db()
-    menu = await db.mess_menu.find_one({"id": menu_id})
-    if not menu:
+    updated_menu = await toggle_keyed_choice(
+        db.mess_menu, {"id": menu_id}, "voters", current_user["id"], vote_type,
+        {"up": "votes_up", "down": "votes_down"}
+    )
+    if not updated_menu:
         raise HTTPException(status_code=404, detail="Menu not found")
-        
-    user_id = current_user["id"]
-    voters = menu.get("voters", {})
-    
-    # Remove previous vote if exists
-    previous_vote = voters.get(user_id)
-    
-    update_query = {}
-    
-    if previous_vote == vote_type:
-        # Toggle off (remove vote)
-        del voters[user_id]
-        if vote_type == "up":
-            update_query["$inc"] = {"votes_up": -1}
-        else:
-            update_query["$inc"] = {"votes_down": -1}
-    else:
-        # Change vote or new vote
-        if previous_vote:
-            # Reverse previous count
-            if previous_vote == "up":
-                update_query.setdefault("$inc", {})["votes_up"] = -1
-            else:
-                update_query.setdefault("$inc", {})["votes_down"] = -1
-        
-        # Add new vote
-        voters[user_id] = vote_type
-        if vote_type == "up":
-            update_query.setdefault("$inc", {})["votes_up"] = update_query.get("$inc", {}).get("votes_up", 0) + 1
-        else:
-            update_query.setdefault("$inc", {})["votes_down"] = update_query.get("$inc", {}).get("votes_down", 0) + 1
-            
-    update_query["$set"] = {"voters": voters}
-    
-    await db.mess_menu.update_one({"id": menu_id}, update_query)
     
-    updated_menu = await db.mess_menu.find_one({"id": menu_id}, {"_id": 0})
     return MessMenuResponse(**updated_menu)
 
 @router.post("/polls", response_model=PollResponse, status_code=201)
 async def create_poll(
     poll_data: PollCreate,
-    current_user: dict = Depends(require_role(["management", "admin"]))
+    current_user: dict = Depends(require_role(["management", "admin"])),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
-    db = get_db()
     poll_id = str(uuid.uuid4())
     
     options = []
@@ -154,9 +116,9 @@ async def create_poll(
 @router.get("/polls", response_model=List[PollResponse])
 async def get_polls(
     active_only: bool = True,
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
-    db = get_db()
     query = {}
     if active_only:
         query["is_active"] = True
@@ -168,46 +130,32 @@ async def get_polls(
 async def vote_poll(
     poll_id: str,
     vote_data: dict = Body(...),
-    current_user: dict = Depends(get_current_user)
+    current_user: dict = Depends(get_current_user),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
     option_id = vote_data.get("option_id")
     if not option_id:
         raise HTTPException(status_code=400, detail="Option ID required")
         
-    db = get_db()
-    poll = await db.polls.find_one({"id": poll_id})
+    user_id = current_user["id"]
+    updated_poll = await record_single_choice(
+        db.polls,
+        {"id": poll_id, "is_active": True, "options.id": option_id},
+        "voters", user_id, option_id,
+        {"$inc": {"options.$.votes": 1, "total_votes": 1}}
+    )
+    if updated_poll:
+        return PollResponse(**updated_poll)
+    
+    # Work out why the vote was rejected
+    poll = await db.polls.find_one({"id": poll_id}, {"_id": 0, "is_active": 1, f"voters.{user_id}": 1})
     if not poll:
         raise HTTPException(status_code=404, detail="Poll not found")
         
     if not poll["is_active"]:
         raise HTTPException(status_code=400, detail="Poll is closed")
         
-    user_id = current_user["id"]
-    voters = poll.get("voters", {})
-    
-    if user_id in voters:
+    if user_id in poll.get("voters", {}):
         raise HTTPException(status_code=400, detail="Already voted")
         
-    # Find option index
-    options = poll["options"]
-    option_index = next((i for i, o in enumerate(options) if o["id"] == option_id), -1)
-    
-    if option_index == -1:
-        raise HTTPException(status_code=404, detail="Option not found")
-        
-    # Update vote
-    await db.polls.update_one(
-        {"id": poll_id},
-        {
-            "$inc": {
-                f"options.{option_index}.votes": 1,
-                "total_votes": 1
-            },
-            "$set": {
-                f"voters.{user_id}": option_id
-            }
-        }
-    )
-    
-    updated_poll = await db.polls.find_one({"id": poll_id}, {"_id": 0})
-    return PollResponse(**updated_poll)
+    raise HTTPException(status_code=404, detail="Option not found")
@@ -1,22 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException
 from typing import List, Dict, Any
-from motor.motor_asyncio import AsyncIOMotorClient
-import os
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from services.database import get_db
 from middleware.auth import require_role
 
 router = APIRouter(prefix="/rooms", tags=["Rooms"])
 
-def get_db():
-    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
-    return client[os.environ['DB_NAME']]
-
 @router.get("/occupancy")
 async def get_room_occupancy(
     hostel: str = "Hostel-A",
-    current_user: dict = Depends(require_role(["management", "admin"]))
+    current_user: dict = Depends(require_role(["management", "admin"])),
+    db: AsyncIOMotorDatabase = Depends(get_db)
 ):
-    db = get_db()
-    
     # 1. Define Hostel Structure (Mocked for Hackathon)
     # 3 Blocks, 3 Floors, 10 Rooms per floor
     blocks = ["Block-1", "Block-2", "Block-3"]
@@ -1,33 +1,57 @@
-from fastapi import FastAPI, APIRouter, File, UploadFile, Depends, HTTPException, Query
+from fastapi import FastAPI, APIRouter, File, UploadFile, Depends, HTTPException, Header, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ReturnDocument, UpdateOne
 from dotenv import load_dotenv
 from pathlib import Path
 import os
 import logging
-from datetime import datetime, timezone
+from datetime import date, datetime, timedelta, timezone
 import uuid
-from typing import List, Optional
+from typing import Dict, List, Optional
 
-from models.user import UserResponse
-from models.issue import (IssueCreate, IssueResponse, IssueUpdate, CommentCreate, 
+from models.user import UserResponse, UserActiveUpdate
+from fastapi.encoders import jsonable_encoder
+from models.issue import (IssueCreate, IssueResponse, IssueCreateResponse, IssueSummary, SimilarIssue, IssueUpdate, IssueBulkUpdate, IssueRebalance, CommentCreate, 
                           FeedbackCreate, MediaItem, Location, StatusHistoryItem, 
-                          Comment, IssueStatus, IssuePriority, IssueCategory)
+                          Comment, IssueStatus, IssuePriority, IssueCategory, OPEN_STATUSES)
 from models.announcement import (AnnouncementCreate, AnnouncementResponse, 
                                   NotificationCreate, NotificationResponse)
 from models.lostfound import LostFoundCreate, LostFoundResponse, LostFoundStatus
-from middleware.auth import get_current_user, require_role
-from utils.ticket_generator import generate_ticket_id
+from middleware.auth import get_current_user, require_role, invalidate_user, load_user, user_cache
 from utils.cloudinary_utils import upload_file
+from utils.password import password_pool_stats
+from utils.atomic import toggle_membership
+from utils.timing import ServerTiming, SERVER_TIMING_HEADER
+from utils.result_cache import ResultCache
+from utils.export import ISSUE_EXPORT_FIELDS, EXPORT_MEDIA_TYPES, export_projection, stream_export
+from utils.search import ticket_id_prefix_filter, text_search_terms
+from utils.pagination import paginate, decode_cursor, set_cursor_headers, NEXT_CURSOR_HEADER, PREV_CURSOR_HEADER
 from services.ai_service import ai_service
+from services.database import database
+from services.job_queue import job_queue
+from services.view_counter import view_counter
+from services.ticket_sequence import ticket_sequence
+from services.similarity import similarity_index
+from services.escalation import escalation_scheduler
+from services.assignment import assignment_engine
+from services.notifications import (build_notification, notify, role_audience, hostel_audience,
+                                    block_audience, read_state, inbox_query, apply_read_state, mark_read, mark_all_read,
+                                    inbox_stream)
+from services.broker import broker
+from services.issue_stats import (stats_key, track_stats, record_created, record_transitions,
+                                  trends as issue_trends, TREND_GROUPS)
+from services.indexes import ensure_indexes, index_report
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Analytics results, dropped whenever an issue is created, updated or merged
+analytics_cache = ResultCache(
+    max_size=int(os.environ.get('ANALYTICS_CACHE_MAX_SIZE', 256)),
+    ttl_seconds=float(os.environ.get('ANALYTICS_CACHE_TTL_SECONDS', 30))
+)
 
 app = FastAPI(title="Hostel Management System")
 
@@ -40,6 +64,7 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, PREV_CURSOR_HEADER, SERVER_TIMING_HEADER],
 )
 
 api_router = APIRouter(prefix="/api")
@@ -67,27 +92,75 @@ api_router.include_router(rooms_router)
 # ============= ISSUE ROUTES =============
 issue_router = APIRouter(prefix="/issues", tags=["Issues"])
 
-@issue_router.post("/", response_model=IssueResponse, status_code=201)
+def assignment_notification(issue: dict, assignee: dict) -> dict:
+    priority = issue.get("priority")
+    return build_notification(
+        assignee["id"], "ISSUE_ASSIGNED", "Issue Assigned",
+        f"{issue.get('ticket_id')} assigned to you: {issue.get('title')}",
+        link=f"/issues/{issue['id']}",
+        priority=getattr(priority, "value", priority) or "Medium",
+        related_issue=issue["id"]
+    )
+
+async def apply_assignments(issues: Dict[str, dict], changes: List[dict]) -> int:
+    """Write assignment decisions ({"issue_id", "previous_id", "assignee"}) and notify the assignees.
+
+    Each write only applies if the issue is still with its previous assignee,
+    so an assignment made by someone in the meantime is kept.
+    """
+    if not changes:
+        return 0
+    now = datetime.now(timezone.utc).isoformat()
+    result = await database.db.issues.bulk_write([
+        UpdateOne(
+            {"id": change["issue_id"], "assigned_to": change["previous_id"]},
+            {"$set": {
+                "assigned_to": change["assignee"]["id"],
+                "assigned_to_name": change["assignee"]["name"],
+                "updated_at": now
+            }}
+        )
+        for change in changes
+    ], ordered=False)
+    await notify(database.db, [
+        assignment_notification(issues[change["issue_id"]], change["assignee"]) for change in changes
+    ])
+    return result.modified_count
+
+async def reassign_recategorized(issues: List[dict]) -> Dict[str, dict]:
+    """Pick new assignees for open issues whose category changed; returns them by issue id"""
+    if not assignment_engine.enabled:
+        return {}
+    changes = []
+    for issue in issues:
+        if issue.get("status") not in OPEN_STATUSES:
+            continue
+        previous = issue.get("assigned_to")
+        # Score the current assignee without this issue, as plan_rebalance does
+        assignment_engine.record_assignment(None, previous)
+        assignee = assignment_engine.choose(issue, keep=previous)
+        assignment_engine.record_assignment(assignee["id"] if assignee else previous)
+        if assignee and assignee["id"] != previous:
+            changes.append({"issue_id": issue["id"], "previous_id": previous, "assignee": assignee})
+    await apply_assignments({issue["id"]: issue for issue in issues}, changes)
+    return {change["issue_id"]: change["assignee"] for change in changes}
+
+def track_assignment_load(issue: dict):
+    """Keep the assignment engine's open-issue loads in step with an applied update"""
+    previous_status = (issue.get("stats_key_before") or {}).get("status")
+    assignment_engine.record_update(
+        issue.get("assigned_to_before"), issue.get("assigned_to"), previous_status, issue.get("status")
+    )
+
+@issue_router.post("/", response_model=IssueCreateResponse, status_code=201)
 async def create_issue(
     issue_data: IssueCreate,
     current_user: dict = Depends(get_current_user)
 ):
     user = current_user
-    ticket_id = generate_ticket_id()
+    ticket_id = await ticket_sequence.next_id(database.db)
     issue_id = str(uuid.uuid4())
     
-    ai_predictions = None
-    try:
-        prediction = await ai_service.predict_issue_category(issue_data.title, issue_data.description)
-        ai_predictions = {
-            "category": prediction.get("category"),
-            "priority": prediction.get("priority"),
-            "confidence_score": prediction.get("confidence"),
-            "estimated_resolution_hours": prediction.get("estimated_hours")
-        }
-    except Exception as e:
-        logger.error(f"AI prediction failed: {e}")
-    
     issue_doc = {
         "id": issue_id,
         "ticket_id": ticket_id,
@@ -108,7 +181,7 @@ async def create_issue(
         "media": [],
         "assigned_to": None,
         "assigned_to_name": None,
-        "ai_predictions": ai_predictions,
+        "ai_predictions": {"status": "pending"},
         "status_history": [{
             "old_status": None,
             "new_status": IssueStatus.REPORTED,
@@ -117,7 +190,7 @@ async def create_issue(
             "remarks": "Issue reported",
             "timestamp": datetime.now(timezone.utc).isoformat()
         }],
-        "comments": [],
+        "comment_count": 0,
         "resolution": None,
         "feedback": None,
         "reported_at": datetime.now(timezone.utc).isoformat(),
@@ -127,36 +200,130 @@ async def create_issue(
         "merged_issues": [],
         "views": 0,
         "upvotes": [],
+        "upvote_count": 0,
         "created_at": datetime.now(timezone.utc).isoformat(),
         "updated_at": datetime.now(timezone.utc).isoformat()
     }
     
-    await db.issues.insert_one(issue_doc)
+    assignee = assignment_engine.choose(issue_doc) if assignment_engine.enabled else None
+    if assignee:
+        issue_doc["assigned_to"] = assignee["id"]
+        issue_doc["assigned_to_name"] = assignee["name"]
+    issue_doc["stats_key"] = stats_key(issue_doc)
+    
+    possible_duplicates = similarity_index.find_similar(issue_doc, viewer=user)
+    await database.db.issues.insert_one(issue_doc)
+    similarity_index.add(issue_doc)
+    if assignee:
+        assignment_engine.record_assignment(assignee["id"])
+    try:
+        await record_created(database.db, issue_doc)
+    except Exception as e:
+        logger.error(f"Failed to update issue stats for {issue_id}: {e}")
+    analytics_cache.invalidate_all()
     
-    await db.notifications.insert_one({
-        "id": str(uuid.uuid4()),
-        "recipient": "management",
-        "type": "NEW_ISSUE",
-        "title": "New Issue Reported",
-        "message": f"{issue_data.category} issue reported in {user.get('hostel', 'N/A')}",
-        "related_issue": issue_id,
-        "link": f"/issues/{issue_id}",
-        "is_read": False,
-        "priority": issue_data.priority,
-        "created_at": datetime.now(timezone.utc).isoformat()
-    })
+    # AI classification runs in the background so submit latency does not
+    # include the model round trip
+    try:
+        await job_queue.enqueue("classify_issue", {"issue_id": issue_id})
+    except Exception as e:
+        logger.error(f"Failed to enqueue AI classification for {issue_id}: {e}")
+    
+    notifications = [build_notification(
+        role_audience("management"), "NEW_ISSUE", "New Issue Reported",
+        f"{issue_data.category.value} issue reported in {user.get('hostel', 'N/A')}",
+        link=f"/issues/{issue_id}",
+        priority=issue_data.priority.value,
+        related_issue=issue_id
+    )]
+    if assignee:
+        notifications.append(assignment_notification(issue_doc, assignee))
+    await notify(database.db, notifications)
+    
+    return IssueCreateResponse(**issue_doc, possible_duplicates=possible_duplicates)
+
+async def classify_issue_job(payload: dict, final_attempt: bool):
+    """Background job: fill in ai_predictions for a newly created issue.
+
+    Model failures are raised so the job queue retries with backoff; only
+    the final attempt settles for the keyword fallback.
+    """
+    issue_id = payload["issue_id"]
+    issue = await database.db.issues.find_one({"id": issue_id}, {"_id": 0, "title": 1, "description": 1})
+    if not issue:
+        return
     
-    return IssueResponse(**issue_doc)
+    prediction = await ai_service.predict_issue_category(
+        issue["title"], issue["description"], fallback=final_attempt
+    )
+    await database.db.issues.update_one(
+        {"id": issue_id},
+        {"$set": {"ai_predictions": {
+            "category": prediction.get("category"),
+            "priority": prediction.get("priority"),
+            "confidence_score": prediction.get("confidence"),
+            "estimated_resolution_hours": prediction.get("estimated_hours"),
+            "source": prediction.get("source"),
+            "status": "completed"
+        }}}
+    )
+
+job_queue.register("classify_issue", classify_issue_job)
+
+# Projection for ?view=summary: drops status_history, media, upvotes and other
+# arrays that list screens never render
+ISSUE_SUMMARY_PROJECTION = {
+    "_id": 0,
+    **{field: 1 for field in IssueSummary.model_fields if field != "upvote_count"},
+    # Issues upvoted before upvote_count was maintained fall back to the array size
+    "upvote_count": {"$ifNull": ["$upvote_count", {"$size": {"$ifNull": ["$upvotes", []]}}]}
+}
+
+def issue_list_projection(view: str, fields: Optional[str]) -> dict:
+    """Mongo projection for an issue list request (?view= / ?fields=)"""
+    if fields:
+        requested = {f.strip() for f in fields.split(",") if f.strip()}
+        unknown = requested - set(IssueResponse.model_fields)
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+        # id and created_at are always returned so cursors can be built
+        projection = {"_id": 0, "id": 1, "created_at": 1, **{f: 1 for f in requested}}
+        if "upvote_count" in requested:
+            projection["upvote_count"] = ISSUE_SUMMARY_PROJECTION["upvote_count"]
+        return projection
+    if view == "summary":
+        return dict(ISSUE_SUMMARY_PROJECTION)
+    return {"_id": 0, "comments": 0}
+
+def serialize_issue_list(issues: List[dict], view: str, fields: Optional[str]) -> list:
+    if fields:
+        # Sparse fieldsets skip model validation entirely
+        return jsonable_encoder([{k: v for k, v in issue.items() if k != "score"} for issue in issues])
+    if view == "summary":
+        return [IssueSummary(**issue) for issue in issues]
+    for issue in issues:
+        issue.setdefault("upvote_count", len(issue.get("upvotes", [])))
+    return [IssueResponse(**issue) for issue in issues]
 
-@issue_router.get("/", response_model=List[IssueResponse])
+@issue_router.get("/", response_model=None, responses={200: {"model": List[IssueResponse]}})
 async def get_issues(
+    response: Response,
     status: Optional[str] = None,
     category: Optional[str] = None,
     priority: Optional[str] = None,
     page: int = Query(1, ge=1),
     limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    view: str = Query("full", pattern="^(full|summary)$"),
+    fields: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
+    """List issues, newest first.
+
+    Pass the X-Next-Cursor / X-Prev-Cursor response header back as `cursor`
+    to page through results; `page` is kept for older clients. `view=summary`
+    returns IssueSummary objects and `fields=a,b,c` returns only those fields.
+    """
     query = {}
     
     if status:
@@ -172,80 +339,275 @@ async def get_issues(
             {"visibility": "Public", "location.hostel": current_user.get("hostel")}
         ]
     
-    skip = (page - 1) * limit
-    issues = await db.issues.find(query, {"_id": 0}).sort("created_at", -1).skip(skip).limit(limit).to_list(limit)
+    projection = issue_list_projection(view, fields)
+    if cursor or page == 1:
+        issues, next_cursor, prev_cursor = await paginate(database.db.issues, query, cursor, limit, projection=projection)
+        set_cursor_headers(response, next_cursor, prev_cursor)
+    else:
+        skip = (page - 1) * limit
+        issues = await database.db.issues.find(query, projection).sort([("created_at", -1), ("id", -1)]).skip(skip).limit(limit).to_list(limit)
     
-    return [IssueResponse(**issue) for issue in issues]
+    return serialize_issue_list(issues, view, fields)
+
+@issue_router.get("/search", response_model=None, responses={200: {"model": List[IssueResponse]}})
+async def search_issues(
+    query: str = None,
+    category: str = None,
+    priority: str = None,
+    status: str = None,
+    visibility: str = None,
+    page: int = Query(1, ge=1),
+    limit: int = Query(50, ge=1, le=100),
+    view: str = Query("full", pattern="^(full|summary)$"),
+    fields: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Search and filter issues with multiple criteria.
+
+    Ticket IDs (or their prefix, e.g. HST-2401) are matched on the ticket_id
+    index; any other query runs against the text index and is ranked by
+    relevance. Without a query, results are newest first.
+    """
+    clauses = []
+    
+    if category:
+        clauses.append({"category": category})
+    if priority:
+        clauses.append({"priority": priority})
+    if status:
+        clauses.append({"status": status})
+    if visibility:
+        clauses.append({"visibility": visibility})
+    
+    # Apply role-based filtering
+    if current_user["role"] == "student":
+        if not visibility:
+            clauses.append({"$or": [
+                {"reporter_id": current_user["id"]},
+                {"visibility": "Public", "location.hostel": current_user.get("hostel")}
+            ]})
+        else:
+            clauses.append({"reporter_id": current_user["id"]})
+    
+    projection = issue_list_projection(view, fields)
+    sort = [("created_at", -1), ("id", -1)]
+    if query and query.strip():
+        ticket_filter = ticket_id_prefix_filter(query)
+        if ticket_filter:
+            clauses.append(ticket_filter)
+        else:
+            terms = text_search_terms(query)
+            if not terms:
+                return []
+            clauses.append({"$text": {"$search": terms}})
+            projection["score"] = {"$meta": "textScore"}
+            sort = [("score", {"$meta": "textScore"}), ("created_at", -1)]
+    
+    filters = {"$and": clauses} if clauses else {}
+    skip = (page - 1) * limit
+    issues = await database.db.issues.find(filters, projection).sort(sort).skip(skip).limit(limit).to_list(limit)
+    return serialize_issue_list(issues, view, fields)
 
 @issue_router.get("/{issue_id}", response_model=IssueResponse)
 async def get_issue(issue_id: str, current_user: dict = Depends(get_current_user)):
-    issue = await db.issues.find_one({"id": issue_id}, {"_id": 0})
+    issue = await database.db.issues.find_one({"id": issue_id}, {"_id": 0, "comments": 0})
     if not issue:
         raise HTTPException(status_code=404, detail="Issue not found")
     
-    await db.issues.update_one({"id": issue_id}, {"$inc": {"views": 1}})
-    issue["views"] += 1
+    # Written back in batches by the view counter
+    view_counter.record(issue_id)
+    issue.setdefault("upvote_count", len(issue.get("upvotes", [])))
+    issue["views"] = issue.get("views", 0) + view_counter.pending_for(issue_id)
     
     return IssueResponse(**issue)
 
+def issue_update_pipeline(update_data: IssueUpdate, current_user: dict, assignee: Optional[dict] = None) -> list:
+    """Update pipeline applying a status transition, assignment, re-categorization and/or priority change.
+
+    The history entry and resolution are built from the document's current
+    values inside the update, so the change is atomic and needs no prior read.
+    Response and resolution durations are stored at transition time so SLA
+    metrics never have to parse status_history.
+    """
+    now_dt = datetime.now(timezone.utc)
+    now = now_dt.isoformat()
+    hours_since_reported = {"$divide": [
+        {"$subtract": [now_dt, {"$toDate": "$reported_at"}]}, 1000 * 3600
+    ]}
+    # Read back by track_assignment_load, like stats_key_before by record_transitions
+    fields = {"updated_at": now, "assigned_to_before": "$assigned_to"}
+    if update_data.status:
+        fields["status"] = {"$literal": update_data.status}
+        # The first change of status after reporting is the first response;
+        # updates keeping the status (as merges record) are not, as in
+        # migrate_issue_durations
+        status_changed = {"$ne": ["$status", {"$literal": update_data.status}]}
+        fields["first_response_at"] = {"$ifNull": [
+            "$first_response_at", {"$cond": [status_changed, now, "$$REMOVE"]}
+        ]}
+        fields["response_time_hours"] = {"$ifNull": [
+            "$response_time_hours", {"$cond": [status_changed, hours_since_reported, "$$REMOVE"]}
+        ]}
+        fields["status_history"] = {"$concatArrays": [
+            {"$ifNull": ["$status_history", []]},
+            [{
+                "old_status": "$status",
+                "new_status": {"$literal": update_data.status},
+                "updated_by": {"$literal": current_user["id"]},
+                "updated_by_name": {"$literal": current_user["name"]},
+                "remarks": {"$literal": update_data.remarks},
+                "timestamp": now
+            }]
+        ]}
+        
+        if update_data.status == IssueStatus.RESOLVED:
+            # 'resolution' starts out as null, so the whole object is rebuilt,
+            # keeping any notes and media already attached
+            fields["resolution"] = {
+                "resolved_at": now,
+                "resolved_by": {"$literal": current_user["id"]},
+                "resolved_by_name": {"$literal": current_user["name"]},
+                "resolution_notes": {"$ifNull": ["$resolution.resolution_notes", None]},
+                "resolution_media": {"$ifNull": ["$resolution.resolution_media", []]}
+            }
+            fields["resolved_at"] = now
+            fields["resolution_time_hours"] = hours_since_reported
+        elif update_data.status == IssueStatus.CLOSED:
+            fields["closed_at"] = now
+        else:
+            # Reopened issues are no longer counted as resolved
+            fields["resolved_at"] = "$$REMOVE"
+            fields["resolution_time_hours"] = "$$REMOVE"
+    
+    if assignee:
+        fields["assigned_to"] = {"$literal": assignee["id"]}
+        fields["assigned_to_name"] = {"$literal": assignee["name"]}
+    
+    if update_data.priority:
+        fields["priority"] = {"$literal": update_data.priority}
+    
+    if update_data.category:
+        fields["category"] = {"$literal": update_data.category}
+    
+    return track_stats([{"$set": fields}])
+
+@issue_router.patch("/bulk/status")
+async def bulk_update_issue_status(
+    bulk_data: IssueBulkUpdate,
+    current_user: dict = Depends(require_role(["management"]))
+):
+    """Transition, assign, re-categorize or reprioritise many issues in one bulk write"""
+    assignee_ids = {item.assigned_to for item in bulk_data.updates if item.assigned_to}
+    assignees = {}
+    if assignee_ids:
+        async for user in database.db.users.find({"id": {"$in": list(assignee_ids)}}, {"_id": 0, "id": 1, "name": 1}):
+            assignees[user["id"]] = user
+    
+    operations = [
+        UpdateOne(
+            {"id": item.issue_id},
+            issue_update_pipeline(item, current_user, assignees.get(item.assigned_to))
+        )
+        for item in bulk_data.updates
+    ]
+    result = await database.db.issues.bulk_write(operations, ordered=False)
+    
+    # Each issue now holds the bucket it left and the one it entered; a
+    # concurrent update to the same issue in between can skew the rollups
+    # until the next rebuild
+    updated = await database.db.issues.find(
+        {"id": {"$in": [item.issue_id for item in bulk_data.updates]}},
+        {"_id": 0, "id": 1, "ticket_id": 1, "title": 1, "description": 1, "category": 1, "priority": 1,
+         "status": 1, "visibility": 1, "reporter_id": 1, "location": 1, "is_duplicate": 1,
+         "assigned_to": 1, "assigned_to_before": 1, "stats_key_before": 1, "stats_key": 1}
+    ).to_list(len(operations))
+    try:
+        await record_transitions(database.db, updated)
+    except Exception as e:
+        logger.error(f"Failed to update issue stats for {len(updated)} issues: {e}")
+    analytics_cache.invalidate_all()
+    
+    items = {item.issue_id: item for item in bulk_data.updates}
+    recategorized = []
+    for issue in updated:
+        item = items[issue["id"]]
+        track_assignment_load(issue)
+        similarity_index.add(issue)
+        if item.category and not item.assigned_to:
+            recategorized.append(issue)
+    reassigned = await reassign_recategorized(recategorized)
+    
+    return {
+        "requested": len(operations),
+        "matched": result.matched_count,
+        "modified": result.modified_count,
+        "auto_assigned": len(reassigned)
+    }
+
+@issue_router.post("/assignment/rebalance")
+async def rebalance_assignments(
+    params: IssueRebalance,
+    current_user: dict = Depends(require_role(["management"]))
+):
+    """Spread open issues across on-shift staff by expertise, area and open-issue load"""
+    query = {"status": {"$in": OPEN_STATUSES}, "is_duplicate": {"$ne": True}}
+    if params.hostel:
+        query["location.hostel"] = params.hostel
+    if params.block:
+        query["location.block"] = params.block
+    if params.category:
+        query["category"] = params.category
+    if params.unassigned_only:
+        query["assigned_to"] = None
+    
+    issues = await database.db.issues.find(
+        query,
+        {"_id": 0, "id": 1, "ticket_id": 1, "title": 1, "category": 1, "priority": 1,
+         "location": 1, "assigned_to": 1, "reported_at": 1}
+    ).sort("reported_at", 1).limit(params.limit).to_list(params.limit)
+    
+    changes = assignment_engine.plan_rebalance(issues)
+    reassigned = await apply_assignments({issue["id"]: issue for issue in issues}, changes)
+    return {
+        "considered": len(issues),
+        "planned": len(changes),
+        "reassigned": reassigned
+    }
+
 @issue_router.patch("/{issue_id}/status", response_model=IssueResponse)
 async def update_issue_status(
     issue_id: str,
     update_data: IssueUpdate,
     current_user: dict = Depends(get_current_user)
 ):
-    issue = await db.issues.find_one({"id": issue_id}, {"_id": 0})
-    if not issue:
-        raise HTTPException(status_code=404, detail="Issue not found")
-    
     if current_user["role"] != "management":
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    update_dict = {}
-    if update_data.status:
-        update_dict["status"] = update_data.status
-        history_item = {
-            "old_status": issue["status"],
-            "new_status": update_data.status,
-            "updated_by": current_user["id"],
-            "updated_by_name": current_user["name"],
-            "remarks": update_data.remarks,
-            "timestamp": datetime.now(timezone.utc).isoformat()
-        }
-        await db.issues.update_one(
-            {"id": issue_id},
-            {"$push": {"status_history": history_item}}
-        )
-        
-        if update_data.status == IssueStatus.RESOLVED:
-            # We need to construct the full resolution object because 'resolution' is initially None (null)
-            # and MongoDB cannot update nested fields of a null field.
-            current_resolution = issue.get("resolution") or {}
-            
-            update_dict["resolution"] = {
-                "resolved_at": datetime.now(timezone.utc).isoformat(),
-                "resolved_by": current_user["id"],
-                "resolved_by_name": current_user["name"],
-                "resolution_notes": current_resolution.get("resolution_notes"),
-                "resolution_media": current_resolution.get("resolution_media", [])
-            }
-        elif update_data.status == IssueStatus.CLOSED:
-            update_dict["closed_at"] = datetime.now(timezone.utc).isoformat()
-    
+    assignee = None
     if update_data.assigned_to:
-        assignee = await db.users.find_one({"id": update_data.assigned_to}, {"_id": 0})
-        if assignee:
-            update_dict["assigned_to"] = update_data.assigned_to
-            update_dict["assigned_to_name"] = assignee["name"]
-    
-    if update_data.priority:
-        update_dict["priority"] = update_data.priority
-    
-    update_dict["updated_at"] = datetime.now(timezone.utc).isoformat()
+        assignee = await load_user(database.db, update_data.assigned_to)
     
-    await db.issues.update_one({"id": issue_id}, {"$set": update_dict})
+    updated_issue = await database.db.issues.find_one_and_update(
+        {"id": issue_id},
+        issue_update_pipeline(update_data, current_user, assignee),
+        projection={"_id": 0, "comments": 0},
+        return_document=ReturnDocument.AFTER
+    )
+    if not updated_issue:
+        raise HTTPException(status_code=404, detail="Issue not found")
     
-    updated_issue = await db.issues.find_one({"id": issue_id}, {"_id": 0})
+    try:
+        await record_transitions(database.db, [updated_issue])
+    except Exception as e:
+        logger.error(f"Failed to update issue stats for {issue_id}: {e}")
+    analytics_cache.invalidate_all()
+    track_assignment_load(updated_issue)
+    similarity_index.add(updated_issue)
+    if update_data.category and not update_data.assigned_to:
+        reassigned = await reassign_recategorized([updated_issue])
+        if issue_id in reassigned:
+            updated_issue["assigned_to"] = reassigned[issue_id]["id"]
+            updated_issue["assigned_to_name"] = reassigned[issue_id]["name"]
     return IssueResponse(**updated_issue)
 
 @issue_router.post("/{issue_id}/comments", response_model=Comment)
@@ -254,25 +616,66 @@ async def add_comment(
     comment_data: CommentCreate,
     current_user: dict = Depends(get_current_user)
 ):
-    issue = await db.issues.find_one({"id": issue_id}, {"_id": 0})
-    if not issue:
+    if comment_data.parent_comment:
+        parent = await database.db.comments.find_one(
+            {"id": comment_data.parent_comment, "issue_id": issue_id}, {"_id": 0, "id": 1}
+        )
+        if not parent:
+            raise HTTPException(status_code=404, detail="Parent comment not found")
+    
+    if not await database.db.issues.find_one({"id": issue_id}, {"_id": 0, "id": 1}):
         raise HTTPException(status_code=404, detail="Issue not found")
     
     comment_id = str(uuid.uuid4())
     comment = {
         "id": comment_id,
+        "issue_id": issue_id,
         "user_id": current_user["id"],
         "user_name": current_user["name"],
         "user_role": current_user["role"],
         "text": comment_data.text,
         "parent_comment": comment_data.parent_comment,
+        "likes": [],
+        "likes_count": 0,
+        "reply_count": 0,
         "created_at": datetime.now(timezone.utc).isoformat()
     }
     
-    await db.issues.update_one({"id": issue_id}, {"$push": {"comments": comment}})
+    await database.db.comments.insert_one(dict(comment))
+    # The issue only keeps a counter; it is bumped once the comment is stored
+    # so a failed insert cannot inflate it
+    await database.db.issues.update_one({"id": issue_id}, {"$inc": {"comment_count": 1}})
+    
+    if comment_data.parent_comment:
+        await database.db.comments.update_one({"id": comment_data.parent_comment}, {"$inc": {"reply_count": 1}})
     
     return Comment(**comment)
 
+@issue_router.get("/{issue_id}/comments", response_model=List[Comment])
+async def get_comments(
+    issue_id: str,
+    response: Response,
+    parent_comment: Optional[str] = None,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
+    current_user: dict = Depends(get_current_user)
+):
+    """Comments of an issue, oldest first; pass parent_comment to list replies to one comment"""
+    query = {"issue_id": issue_id}
+    if parent_comment:
+        query["parent_comment"] = parent_comment
+    
+    projection = {
+        "_id": 0, "id": 1, "issue_id": 1, "user_id": 1, "user_name": 1, "user_role": 1,
+        "text": 1, "parent_comment": 1, "likes_count": 1, "reply_count": 1, "created_at": 1,
+        "has_liked": {"$in": [current_user["id"], {"$ifNull": ["$likes", []]}]}
+    }
+    comments, next_cursor, prev_cursor = await paginate(
+        database.db.comments, query, cursor, limit, projection=projection, newest_first=False
+    )
+    set_cursor_headers(response, next_cursor, prev_cursor)
+    return [Comment(**comment) for comment in comments]
+
 @issue_router.post("/{issue_id}/comments/{comment_id}/like")
 async def like_comment(
     issue_id: str,
@@ -280,37 +683,13 @@ async def like_comment(
     current_user: dict = Depends(get_current_user)
 ):
     """Toggle like on a comment"""
-    issue = await db.issues.find_one({"id": issue_id}, {"_id": 0})
-    if not issue:
-        raise HTTPException(status_code=404, detail="Issue not found")
-    
-    # Find the comment in the issue
-    comments = issue.get("comments", [])
-    comment_index = next((i for i, c in enumerate(comments) if c["id"] == comment_id), -1)
-    
-    if comment_index == -1:
+    result = await toggle_membership(
+        database.db.comments, {"id": comment_id, "issue_id": issue_id}, "likes", "likes_count", current_user["id"]
+    )
+    if result is None:
         raise HTTPException(status_code=404, detail="Comment not found")
     
-    comment = comments[comment_index]
-    likes = comment.get("likes", [])
-    user_id = current_user["id"]
-    
-    if user_id in likes:
-        # Unlike
-        likes.remove(user_id)
-        await db.issues.update_one(
-            {"id": issue_id, "comments.id": comment_id},
-            {"$pull": {"comments.$.likes": user_id}}
-        )
-    else:
-        # Like
-        likes.append(user_id)
-        await db.issues.update_one(
-            {"id": issue_id, "comments.id": comment_id},
-            {"$addToSet": {"comments.$.likes": user_id}}
-        )
-    
-    return {"likes_count": len(likes), "has_liked": user_id in likes}
+    return {"likes_count": result["likes_count"], "has_liked": result["is_member"]}
 
 @issue_router.post("/{issue_id}/upload", response_model=dict)
 async def upload_issue_media(
@@ -318,7 +697,7 @@ async def upload_issue_media(
     file: UploadFile = File(...),
     current_user: dict = Depends(get_current_user)
 ):
-    issue = await db.issues.find_one({"id": issue_id}, {"_id": 0})
+    issue = await database.db.issues.find_one({"id": issue_id}, {"_id": 0})
     if not issue:
         raise HTTPException(status_code=404, detail="Issue not found")
     
@@ -338,7 +717,7 @@ async def upload_issue_media(
         "uploaded_at": datetime.now(timezone.utc).isoformat()
     }
     
-    await db.issues.update_one({"id": issue_id}, {"$push": {"media": media_item}})
+    await database.db.issues.update_one({"id": issue_id}, {"$push": {"media": media_item}})
     
     return media_item
 
@@ -348,23 +727,13 @@ async def upvote_issue(
     current_user: dict = Depends(get_current_user)
 ):
     """Add or remove upvote for an issue"""
-    issue = await db.issues.find_one({"id": issue_id}, {"_id": 0})
-    if not issue:
+    result = await toggle_membership(
+        database.db.issues, {"id": issue_id}, "upvotes", "upvote_count", current_user["id"]
+    )
+    if result is None:
         raise HTTPException(status_code=404, detail="Issue not found")
     
-    user_id = current_user["id"]
-    upvotes = issue.get("upvotes", [])
-    
-    if user_id in upvotes:
-        # Remove upvote
-        await db.issues.update_one({"id": issue_id}, {"$pull": {"upvotes": user_id}})
-        upvotes.remove(user_id)
-    else:
-        # Add upvote
-        await db.issues.update_one({"id": issue_id}, {"$push": {"upvotes": user_id}})
-        upvotes.append(user_id)
-    
-    return {"upvote_count": len(upvotes), "has_upvoted": user_id in upvotes}
+    return {"upvote_count": result["upvote_count"], "has_upvoted": result["is_member"]}
 
 @issue_router.get("/analytics/by-hostel/{hostel}")
 async def get_issues_by_hostel(
@@ -374,62 +743,122 @@ async def get_issues_by_hostel(
     """Get issues breakdown by block for a specific hostel"""
     pipeline = [
         {"$match": {
-            "location.hostel": hostel,
-            "visibility": "Public"
+            "visibility": "Public",
+            "hostel": hostel
         }},
         {"$group": {
             "_id": {
-                "block": "$location.block",
+                "block": "$block",
                 "status": "$status"
             },
-            "count": {"$sum": 1}
+            "count": {"$sum": "$count"}
         }},
+        {"$match": {"count": {"$gt": 0}}},
         {"$sort": {"_id.block": 1, "_id.status": 1}}
     ]
     
-    results = await db.issues.aggregate(pipeline).to_list(100)
-    return {"hostel": hostel, "data": results}
+    async def compute():
+        results = await database.db.issue_stats.aggregate(pipeline).to_list(100)
+        return {"hostel": hostel, "data": results}
+    
+    return await analytics_cache.get_or_compute(("by_hostel", hostel), compute)
 
-@issue_router.get("/search")
-async def search_issues(
-    query: str = None,
-    category: str = None,
-    priority: str = None,
-    status: str = None,
-    visibility: str = None,
-    current_user: dict = Depends(get_current_user)
+# ============= ISSUE DUPLICATE MANAGEMENT =============
+@issue_router.post("/{issue_id}/merge/{duplicate_issue_id}")
+async def merge_duplicate_issues(
+    issue_id: str,
+    duplicate_issue_id: str,
+    current_user: dict = Depends(require_role(["management"]))
 ):
-    """Search and filter issues with multiple criteria"""
-    filters = {}
-    
-    if query:
-        filters["$or"] = [
-            {"title": {"$regex": query, "$options": "i"}},
-            {"description": {"$regex": query, "$options": "i"}},
-            {"ticket_id": {"$regex": query, "$options": "i"}}
-        ]
+    """Merge a duplicate issue into the main issue, preserving all reporters"""
+    main_issue = await database.db.issues.find_one({"id": issue_id}, {"_id": 0})
+    duplicate_issue = await database.db.issues.find_one({"id": duplicate_issue_id}, {"_id": 0})
     
-    if category:
-        filters["category"] = category
-    if priority:
-        filters["priority"] = priority
-    if status:
-        filters["status"] = status
-    if visibility:
-        filters["visibility"] = visibility
+    if not main_issue or not duplicate_issue:
+        raise HTTPException(status_code=404, detail="Issue not found")
     
-    # Apply role-based filtering
-    if current_user["role"] == "student":
-        if "visibility" not in filters:
-            filters["$or"] = [
-                {"reporter_id": current_user["id"]},
-                {"visibility": "Public", "location.hostel": current_user.get("hostel")}
-            ]
-        else:
-            filters["reporter_id"] = current_user["id"]
+    # Track the merge
+    merge_record = {
+        "merged_at": datetime.now(timezone.utc).isoformat(),
+        "merged_by": current_user["id"],
+        "merged_by_name": current_user["name"],
+        "duplicate_issue_id": duplicate_issue_id,
+        "duplicate_reporter_id": duplicate_issue["reporter_id"],
+        "duplicate_reporter_name": duplicate_issue["reporter_name"]
+    }
     
-    issues = await db.issues.find(filters, {"_id": 0}).sort("created_at", -1).limit(50).to_list(50)
-    return [IssueResponse(**issue) for issue in issues]
+    # Update main issue to mark duplicates
+    await database.db.issues.update_one(
+        {"id": issue_id},
+        {
+            "$push": {
+                "merged_issues": duplicate_issue_id,
+                "status_history": {
+                    "old_status": main_issue["status"],
+                    "new_status": main_issue["status"],
+                    "updated_by": current_user["id"],
+                    "updated_by_name": current_user["name"],
+                    "remarks": f"Merged duplicate issue {duplicate_issue_id}",
+                    "timestamp": datetime.now(timezone.utc).isoformat()
+                }
+            },
+            "$set": {"updated_at": datetime.now(timezone.utc).isoformat()}
+        }
+    )
+    
+    # Mark duplicate as merged
+    closed_stats_key = {**stats_key(duplicate_issue), "status": "Closed"}
+    await database.db.issues.update_one(
+        {"id": duplicate_issue_id},
+        {
+            "$set": {
+                "is_duplicate": True,
+                "merged_with": issue_id,
+                "status": "Closed",
+                "closed_at": datetime.now(timezone.utc).isoformat(),
+                "updated_at": datetime.now(timezone.utc).isoformat(),
+                "stats_key": closed_stats_key
+            },
+            "$push": {
+                "status_history": {
+                    "old_status": duplicate_issue["status"],
+                    "new_status": "Closed",
+                    "updated_by": current_user["id"],
+                    "updated_by_name": current_user["name"],
+                    "remarks": f"Merged into issue {issue_id}",
+                    "timestamp": datetime.now(timezone.utc).isoformat()
+                }
+            }
+        }
+    )
+    
+    try:
+        await record_transitions(database.db, [{"stats_key_before": duplicate_issue.get("stats_key"), "stats_key": closed_stats_key}])
+    except Exception as e:
+        logger.error(f"Failed to update issue stats for {duplicate_issue_id}: {e}")
+    analytics_cache.invalidate_all()
+    similarity_index.remove(duplicate_issue_id)
+    
+    updated_main = await database.db.issues.find_one({"id": issue_id}, {"_id": 0})
+    return IssueResponse(**updated_main)
+
+@issue_router.get("/{issue_id}/similar", response_model=List[SimilarIssue])
+async def get_similar_issues(
+    issue_id: str,
+    limit: int = Query(5, ge=1, le=20),
+    current_user: dict = Depends(get_current_user)
+):
+    """Open issues in the same hostel, block and category that look like duplicates"""
+    issue = similarity_index.get(issue_id)
+    if issue is None:
+        issue = await database.db.issues.find_one(
+            {"id": issue_id},
+            {"_id": 0, "id": 1, "title": 1, "description": 1, "category": 1, "location": 1}
+        )
+        if not issue:
+            raise HTTPException(status_code=404, detail="Issue not found")
+    
+    return similarity_index.find_similar(issue, limit=limit, viewer=current_user, exclude_id=issue_id)
 
 api_router.include_router(issue_router)
 
@@ -439,7 +868,7 @@ user_router = APIRouter(prefix="/users", tags=["Users"])
 @user_router.get("/staff", response_model=List[UserResponse])
 async def get_staff_members(current_user: dict = Depends(require_role(["management"]))):
     """Get all staff members (management role)"""
-    staff = await db.users.find({"role": "management"}, {"_id": 0}).to_list(100)
+    staff = await database.db.users.find({"role": "management"}, {"_id": 0}).to_list(100)
     return [UserResponse(**user) for user in staff]
 
 @user_router.get("/students", response_model=List[UserResponse])
@@ -452,9 +881,30 @@ async def get_students(
     if hostel:
         filters["hostel"] = hostel
         
-    students = await db.users.find(filters, {"_id": 0}).to_list(200)
+    students = await database.db.users.find(filters, {"_id": 0}).to_list(200)
     return [UserResponse(**user) for user in students]
 
+@user_router.patch("/{user_id}/active", response_model=UserResponse)
+async def set_user_active(
+    user_id: str,
+    active_data: UserActiveUpdate,
+    current_user: dict = Depends(require_role(["management"]))
+):
+    """Activate or deactivate a user account"""
+    result = await database.db.users.update_one(
+        {"id": user_id},
+        {"$set": {
+            "is_active": active_data.is_active,
+            "updated_at": datetime.now(timezone.utc).isoformat()
+        }}
+    )
+    if result.matched_count == 0:
+        raise HTTPException(status_code=404, detail="User not found")
+    invalidate_user(user_id)
+    
+    user = await database.db.users.find_one({"id": user_id}, {"_id": 0, "password": 0})
+    return UserResponse(**user)
+
 api_router.include_router(user_router)
 
 # ============= ANNOUNCEMENT ROUTES =============
@@ -483,7 +933,28 @@ async def create_announcement(
         "updated_at": datetime.now(timezone.utc).isoformat()
     }
     
-    await db.announcements.insert_one(announcement_doc)
+    await database.db.announcements.insert_one(announcement_doc)
+    
+    # One notification per targeted role, hostel or block, however many users it reaches.
+    # Hostels and blocks narrow down the students; other roles are notified as a whole
+    target = announcement_data.target_audience
+    roles = target.roles or ["student", "management"]
+    hostels = sorted(set(target.hostels or []))
+    blocks = sorted({(b.hostel, b.block) for b in target.blocks or [] if b.hostel not in hostels})
+    audiences = [role_audience(role) for role in roles if role != "student" or not (hostels or blocks)]
+    if "student" in roles:
+        audiences += [hostel_audience(hostel) for hostel in hostels]
+        audiences += [block_audience(hostel, block) for hostel, block in blocks]
+    await notify(database.db, [
+        build_notification(
+            audience, "ANNOUNCEMENT", announcement_data.title,
+            announcement_data.description[:200],
+            link="/announcements",
+            priority="High" if announcement_data.priority == "Urgent" else "Medium",
+            related_announcement=announcement_id
+        )
+        for audience in audiences
+    ])
     return AnnouncementResponse(**announcement_doc)
 
 @announcement_router.get("/", response_model=List[AnnouncementResponse])
@@ -525,7 +996,7 @@ async def get_announcements(current_user: dict = Depends(get_current_user)):
     
     base_query["$or"].append({"$or": target_query_or})
     
-    announcements = await db.announcements.find(base_query, {"_id": 0}).sort([("is_pinned", -1), ("created_at", -1)]).to_list(100)
+    announcements = await database.db.announcements.find(base_query, {"_id": 0}).sort([("is_pinned", -1), ("created_at", -1)]).to_list(100)
     return [AnnouncementResponse(**ann) for ann in announcements]
 
 api_router.include_router(announcement_router)
@@ -535,26 +1006,54 @@ notification_router = APIRouter(prefix="/notifications", tags=["Notifications"])
 
 @notification_router.get("/", response_model=List[NotificationResponse])
 async def get_notifications(
+    response: Response,
     unread_only: bool = False,
+    limit: int = Query(50, ge=1, le=100),
+    cursor: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
-    query = {"recipient": current_user["id"]}
-    if unread_only:
-        query["is_read"] = False
+    """Notifications sent to the user, their role or their hostel, newest first"""
+    state = await read_state(database.db, current_user["id"])
+    query = inbox_query(current_user, state, unread_only)
     
-    notifications = await db.notifications.find(query, {"_id": 0}).sort("created_at", -1).limit(50).to_list(50)
-    return [NotificationResponse(**notif) for notif in notifications]
+    notifications, next_cursor, prev_cursor = await paginate(database.db.notifications, query, cursor, limit)
+    set_cursor_headers(response, next_cursor, prev_cursor)
+    return [NotificationResponse(**apply_read_state(notif, current_user, state)) for notif in notifications]
+
+@notification_router.get("/stream")
+async def stream_notifications(
+    request: Request,
+    last_event_id: Optional[str] = Header(None),
+    current_user: dict = Depends(get_current_user)
+):
+    """Push new inbox notifications as server-sent events.
+
+    On reconnect the Last-Event-ID header replays missed notifications.
+    """
+    if last_event_id:
+        decode_cursor(last_event_id)
+    return StreamingResponse(
+        inbox_stream(database.db, current_user, last_event_id, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            # Keeps GZipMiddleware from buffering events inside the compressor
+            "Content-Encoding": "identity"
+        }
+    )
+
+@notification_router.patch("/read-all")
+async def mark_all_notifications_read(current_user: dict = Depends(get_current_user)):
+    await mark_all_read(database.db, current_user)
+    return {"success": True}
 
 @notification_router.patch("/{notification_id}/read")
 async def mark_notification_read(
     notification_id: str,
     current_user: dict = Depends(get_current_user)
 ):
-    result = await db.notifications.update_one(
-        {"id": notification_id, "recipient": current_user["id"]},
-        {"$set": {"is_read": True, "read_at": datetime.now(timezone.utc).isoformat()}}
-    )
-    if result.modified_count == 0:
+    if not await mark_read(database.db, current_user, notification_id):
         raise HTTPException(status_code=404, detail="Notification not found")
     return {"success": True}
 
@@ -590,7 +1089,7 @@ async def chat_with_ai(
         "created_at": datetime.now(timezone.utc).isoformat()
     }
     
-    await db.ai_conversations.insert_one(conversation_doc)
+    await database.db.ai_conversations.insert_one(conversation_doc)
     
     return {"session_id": session_id, "response": response}
 
@@ -628,13 +1127,16 @@ async def create_lostfound(
         "updated_at": datetime.now(timezone.utc).isoformat()
     }
     
-    await db.lost_found.insert_one(item_doc)
+    await database.db.lost_found.insert_one(item_doc)
     return LostFoundResponse(**item_doc)
 
 @lostfound_router.get("/", response_model=List[LostFoundResponse])
 async def get_lostfound_items(
+    response: Response,
     type: Optional[str] = None,
     category: Optional[str] = None,
+    limit: int = Query(100, ge=1, le=100),
+    cursor: Optional[str] = None,
     current_user: dict = Depends(get_current_user)
 ):
     query = {}
@@ -643,7 +1145,8 @@ async def get_lostfound_items(
     if category:
         query["category"] = category
     
-    items = await db.lost_found.find(query, {"_id": 0}).sort("created_at", -1).to_list(100)
+    items, next_cursor, prev_cursor = await paginate(database.db.lost_found, query, cursor, limit)
+    set_cursor_headers(response, next_cursor, prev_cursor)
     return [LostFoundResponse(**item) for item in items]
 
 @lostfound_router.post("/{item_id}/claim")
@@ -653,7 +1156,7 @@ async def claim_item(
     current_user: dict = Depends(get_current_user)
 ):
     """Student claims a found item or management verifies claim"""
-    item = await db.lost_found.find_one({"id": item_id}, {"_id": 0})
+    item = await database.db.lost_found.find_one({"id": item_id}, {"_id": 0})
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     
@@ -661,7 +1164,7 @@ async def claim_item(
         raise HTTPException(status_code=400, detail="Item already claimed")
     
     # Add claim
-    await db.lost_found.update_one(
+    await database.db.lost_found.update_one(
         {"id": item_id},
         {
             "$set": {
@@ -674,7 +1177,7 @@ async def claim_item(
         }
     )
     
-    updated_item = await db.lost_found.find_one({"id": item_id}, {"_id": 0})
+    updated_item = await database.db.lost_found.find_one({"id": item_id}, {"_id": 0})
     return LostFoundResponse(**updated_item)
 
 @lostfound_router.patch("/{item_id}/verify")
@@ -684,7 +1187,7 @@ async def verify_claim(
     current_user: dict = Depends(require_role(["management"]))
 ):
     """Management verifies a claim"""
-    item = await db.lost_found.find_one({"id": item_id}, {"_id": 0})
+    item = await database.db.lost_found.find_one({"id": item_id}, {"_id": 0})
     if not item:
         raise HTTPException(status_code=404, detail="Item not found")
     
@@ -698,8 +1201,8 @@ async def verify_claim(
         "updated_at": datetime.now(timezone.utc).isoformat()
     }
     
-    await db.lost_found.update_one({"id": item_id}, {"$set": update_data})
-    updated_item = await db.lost_found.find_one({"id": item_id}, {"_id": 0})
+    await database.db.lost_found.update_one({"id": item_id}, {"$set": update_data})
+    updated_item = await database.db.lost_found.find_one({"id": item_id}, {"_id": 0})
     return LostFoundResponse(**updated_item)
 
 api_router.include_router(lostfound_router)
@@ -707,174 +1210,268 @@ api_router.include_router(lostfound_router)
 # ============= ANALYTICS ROUTES =============
 analytics_router = APIRouter(prefix="/analytics", tags=["Analytics"])
 
+# Lower bounds (hours) of the response/resolution time histogram buckets
+SLA_BUCKET_HOURS = [0, 1, 4, 12, 24, 48, 72, 168]
+
+# Documents per cursor batch (and rows per streamed chunk) for exports
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', 1000))
+
 @analytics_router.get("/dashboard")
-async def get_dashboard_analytics(current_user: dict = Depends(require_role(["management"]))):
-    # Only count public issues for analytics
-    total_issues = await db.issues.count_documents({"visibility": "Public"})
-    open_issues = await db.issues.count_documents({
-        "visibility": "Public",
-        "status": {"$in": ["Reported", "Assigned", "In Progress"]}
-    })
-    resolved_issues = await db.issues.count_documents({
-        "visibility": "Public",
-        "status": "Resolved"
-    })
-    
-    # Issues by category
-    pipeline = [
-        {"$match": {"visibility": "Public"}},
-        {"$group": {"_id": "$category", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}}
-    ]
-    by_category = await db.issues.aggregate(pipeline).to_list(10)
-    
-    # Issues by priority
-    pipeline = [
-        {"$match": {"visibility": "Public"}},
-        {"$group": {"_id": "$priority", "count": {"$sum": 1}}}
-    ]
-    by_priority = await db.issues.aggregate(pipeline).to_list(10)
-    
-    # Issues by hostel/block
+async def get_dashboard_analytics(
+    response: Response,
+    current_user: dict = Depends(require_role(["management"]))
+):
+    """Dashboard counts from the issue_stats rollups plus response/resolution times.
+
+    Per-phase durations are reported in the Server-Timing response header;
+    results served from the analytics cache only report the total.
+    """
+    timing = ServerTiming()
+    result = await analytics_cache.get_or_compute(("dashboard",), lambda: compute_dashboard_analytics(timing))
+    timing.apply(response)
+    return result
+
+async def compute_dashboard_analytics(timing: ServerTiming) -> dict:
+    # Only count public issues for analytics; counts come from the issue_stats rollups
     pipeline = [
         {"$match": {"visibility": "Public"}},
-        {"$group": {
-            "_id": {
-                "hostel": "$location.hostel",
-                "block": "$location.block"
-            },
-            "count": {"$sum": 1}
-        }},
-        {"$sort": {"count": -1}}
+        {"$facet": {
+            "totals": [
+                {"$group": {
+                    "_id": None,
+                    "total": {"$sum": "$count"},
+                    "open": {"$sum": {"$cond": [{"$in": ["$status", OPEN_STATUSES]}, "$count", 0]}},
+                    "resolved": {"$sum": {"$cond": [{"$eq": ["$status", "Resolved"]}, "$count", 0]}}
+                }}
+            ],
+            "by_category": [
+                {"$group": {"_id": "$category", "count": {"$sum": "$count"}}},
+                {"$match": {"count": {"$gt": 0}}},
+                {"$sort": {"count": -1}},
+                {"$limit": 10}
+            ],
+            "by_priority": [
+                {"$group": {"_id": "$priority", "count": {"$sum": "$count"}}},
+                {"$match": {"count": {"$gt": 0}}},
+                {"$limit": 10}
+            ],
+            "by_hostel_block": [
+                {"$group": {
+                    "_id": {
+                        "hostel": "$hostel",
+                        "block": "$block"
+                    },
+                    "count": {"$sum": "$count"}
+                }},
+                {"$match": {"count": {"$gt": 0}}},
+                {"$sort": {"count": -1}},
+                {"$limit": 20}
+            ]
+        }}
     ]
-    by_hostel_block = await db.issues.aggregate(pipeline).to_list(20)
+    with timing.phase("rollups"):
+        facets = (await database.db.issue_stats.aggregate(pipeline).to_list(1))[0]
     
-    # Calculate average response and resolution times (for public issues only)
+    # Response and resolution times, stored on each issue when it transitions
     pipeline = [
-        {"$match": {"visibility": "Public", "status_history": {"$exists": True, "$ne": []}}},
-        {"$group": {
-            "_id": None,
-            "total": {"$sum": 1},
-            "avg_response_time": {"$avg": {
-                "$subtract": [
-                    {"$toDate": {"$arrayElemAt": ["$status_history.timestamp", 1]}},
-                    {"$toDate": {"$arrayElemAt": ["$status_history.timestamp", 0]}}
-                ]
-            }},
-            "avg_resolution_time": {"$avg": {
-                "$cond": [
-                    {"$eq": [{"$arrayElemAt": ["$status_history.new_status", -1]}, "Resolved"]},
-                    {
-                        "$subtract": [
-                            {"$toDate": {"$arrayElemAt": ["$status_history.timestamp", -1]}},
-                            {"$toDate": {"$arrayElemAt": ["$status_history.timestamp", 0]}}
-                        ]
-                    },
-                    None
-                ]
-            }}
+        {"$match": {"visibility": "Public", "response_time_hours": {"$gte": 0}}},
+        {"$facet": {
+            "averages": [
+                {"$group": {
+                    "_id": None,
+                    "avg_response_time_hours": {"$avg": "$response_time_hours"},
+                    "avg_resolution_time_hours": {"$avg": "$resolution_time_hours"}
+                }}
+            ],
+            "response_time_buckets": [
+                {"$bucket": {
+                    "groupBy": "$response_time_hours",
+                    "boundaries": SLA_BUCKET_HOURS,
+                    "default": "longer"
+                }}
+            ],
+            "resolution_time_buckets": [
+                {"$match": {"resolution_time_hours": {"$gte": 0}}},
+                {"$bucket": {
+                    "groupBy": "$resolution_time_hours",
+                    "boundaries": SLA_BUCKET_HOURS,
+                    "default": "longer"
+                }}
+            ]
         }}
     ]
-    time_stats = await db.issues.aggregate(pipeline).to_list(1)
-    avg_response_hours = (time_stats[0]["avg_response_time"] / (1000 * 3600)) if time_stats and time_stats[0].get("avg_response_time") else 0
-    avg_resolution_hours = (time_stats[0]["avg_resolution_time"] / (1000 * 3600)) if time_stats and time_stats[0].get("avg_resolution_time") else 0
+    with timing.phase("time_stats"):
+        time_stats = (await database.db.issues.aggregate(pipeline).to_list(1))[0]
+    
+    with timing.phase("shape"):
+        totals = facets["totals"][0] if facets["totals"] else {}
+        averages = time_stats["averages"][0] if time_stats["averages"] else {}
+        total_issues = totals.get("total", 0)
+        resolved_issues = totals.get("resolved", 0)
+        result = {
+            "total_issues": total_issues,
+            "open_issues": totals.get("open", 0),
+            "resolved_issues": resolved_issues,
+            "resolution_rate": round((resolved_issues / total_issues * 100) if total_issues > 0 else 0, 2),
+            "by_category": facets["by_category"],
+            "by_priority": facets["by_priority"],
+            "by_hostel_block": facets["by_hostel_block"],
+            "avg_response_time_hours": round(averages.get("avg_response_time_hours") or 0, 2),
+            "avg_resolution_time_hours": round(averages.get("avg_resolution_time_hours") or 0, 2),
+            "response_time_buckets": time_stats["response_time_buckets"],
+            "resolution_time_buckets": time_stats["resolution_time_buckets"]
+        }
     
+    return result
+
+@analytics_router.get("/trends")
+async def get_issue_trends(
+    response: Response,
+    granularity: str = Query("day", pattern="^(day|week|month)$"),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    group_by: Optional[str] = Query(None, pattern="^(" + "|".join(TREND_GROUPS) + ")$"),
+    hostel: Optional[str] = None,
+    block: Optional[str] = None,
+    category: Optional[IssueCategory] = None,
+    priority: Optional[IssuePriority] = None,
+    current_user: dict = Depends(require_role(["management"]))
+):
+    """Issues reported per day, week or month, optionally split by group_by.
+
+    Defaults to the last 30 days; ranges are limited to about two years.
+    """
+    timing = ServerTiming()
+    end = end or datetime.now(timezone.utc).date()
+    start = start or end - timedelta(days=29)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if (end - start).days > 2 * 366:
+        raise HTTPException(status_code=400, detail="Date range too large")
+    
+    filters = {"hostel": hostel, "block": block, "category": category, "priority": priority}
+    
+    async def compute():
+        with timing.phase("rollups"):
+            return await issue_trends(database.db, start, end, granularity, group_by, filters)
+    
+    key = ("trends", start, end, granularity, group_by, *(str(v) if v else None for v in filters.values()))
+    series = await analytics_cache.get_or_compute(key, compute)
+    
+    timing.apply(response)
     return {
-        "total_issues": total_issues,
-        "open_issues": open_issues,
-        "resolved_issues": resolved_issues,
-        "resolution_rate": round((resolved_issues / total_issues * 100) if total_issues > 0 else 0, 2),
-        "by_category": by_category,
-        "by_priority": by_priority,
-        "by_hostel_block": by_hostel_block,
-        "avg_response_time_hours": round(avg_response_hours, 2),
-        "avg_resolution_time_hours": round(avg_resolution_hours, 2)
+        "granularity": granularity,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "group_by": group_by,
+        "series": series
     }
 
-# ============= ISSUE DUPLICATE MANAGEMENT =============
-@issue_router.post("/{issue_id}/merge/{duplicate_issue_id}")
-async def merge_duplicate_issues(
-    issue_id: str,
-    duplicate_issue_id: str,
+@analytics_router.get("/export/issues")
+async def export_issues(
+    format: str = Query("csv", pattern="^(csv|ndjson)$"),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    status: Optional[IssueStatus] = None,
+    category: Optional[IssueCategory] = None,
+    priority: Optional[IssuePriority] = None,
+    visibility: Optional[str] = Query(None, pattern="^(Public|Private)$"),
+    hostel: Optional[str] = None,
+    block: Optional[str] = None,
+    batch_size: int = Query(EXPORT_BATCH_SIZE, ge=100, le=10000),
     current_user: dict = Depends(require_role(["management"]))
 ):
-    """Merge a duplicate issue into the main issue, preserving all reporters"""
-    main_issue = await db.issues.find_one({"id": issue_id}, {"_id": 0})
-    duplicate_issue = await db.issues.find_one({"id": duplicate_issue_id}, {"_id": 0})
-    
-    if not main_issue or not duplicate_issue:
-        raise HTTPException(status_code=404, detail="Issue not found")
-    
-    # Track the merge
-    merge_record = {
-        "merged_at": datetime.now(timezone.utc).isoformat(),
-        "merged_by": current_user["id"],
-        "merged_by_name": current_user["name"],
-        "duplicate_issue_id": duplicate_issue_id,
-        "duplicate_reporter_id": duplicate_issue["reporter_id"],
-        "duplicate_reporter_name": duplicate_issue["reporter_name"]
-    }
-    
-    # Update main issue to mark duplicates
-    await db.issues.update_one(
-        {"id": issue_id},
-        {
-            "$push": {
-                "merged_issues": duplicate_issue_id,
-                "status_history": {
-                    "old_status": main_issue["status"],
-                    "new_status": main_issue["status"],
-                    "updated_by": current_user["id"],
-                    "updated_by_name": current_user["name"],
-                    "remarks": f"Merged duplicate issue {duplicate_issue_id}",
-                    "timestamp": datetime.now(timezone.utc).isoformat()
-                }
-            },
-            "$set": {"updated_at": datetime.now(timezone.utc).isoformat()}
-        }
-    )
-    
-    # Mark duplicate as merged
-    await db.issues.update_one(
-        {"id": duplicate_issue_id},
-        {
-            "$set": {
-                "is_duplicate": True,
-                "merged_with": issue_id,
-                "status": "Closed",
-                "closed_at": datetime.now(timezone.utc).isoformat(),
-                "updated_at": datetime.now(timezone.utc).isoformat()
-            },
-            "$push": {
-                "status_history": {
-                    "old_status": duplicate_issue["status"],
-                    "new_status": "Closed",
-                    "updated_by": current_user["id"],
-                    "updated_by_name": current_user["name"],
-                    "remarks": f"Merged into issue {issue_id}",
-                    "timestamp": datetime.now(timezone.utc).isoformat()
-                }
-            }
-        }
+    """Stream issues created between start and end (inclusive) as CSV or NDJSON, oldest first.
+
+    Rows are encoded straight from the cursor one batch at a time, so memory
+    use does not depend on the number of issues exported.
+    """
+    query = {}
+    if start or end:
+        query["created_at"] = {}
+        if start:
+            query["created_at"]["$gte"] = start.isoformat()
+        if end:
+            query["created_at"]["$lt"] = (end + timedelta(days=1)).isoformat()
+    for field, value in (("status", status), ("category", category), ("priority", priority),
+                         ("visibility", visibility), ("location.hostel", hostel), ("location.block", block)):
+        if value:
+            query[field] = value
+    
+    cursor = database.db.issues.find(
+        query, export_projection(ISSUE_EXPORT_FIELDS), batch_size=batch_size
+    ).sort([("created_at", 1), ("id", 1)])
+    
+    filename = f"issues-{datetime.now(timezone.utc).strftime('%Y%m%d-%H%M%S')}.{format}"
+    return StreamingResponse(
+        stream_export(cursor, ISSUE_EXPORT_FIELDS, format, batch_size),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
     )
-    
-    updated_main = await db.issues.find_one({"id": issue_id}, {"_id": 0})
-    return IssueResponse(**updated_main)
 
 api_router.include_router(analytics_router)
 
+# ============= SYSTEM ROUTES =============
+system_router = APIRouter(prefix="/system", tags=["System"])
+
+@system_router.get("/metrics")
+async def get_system_metrics(current_user: dict = Depends(require_role(["management"]))):
+    """Runtime metrics for shared infrastructure components"""
+    return {
+        "database_pool": database.stats(),
+        "user_cache": user_cache.stats(),
+        "password_hashing": password_pool_stats(),
+        "ai_service": ai_service.stats(),
+        "job_queue": job_queue.stats(),
+        "view_counter": view_counter.stats(),
+        "ticket_sequence": ticket_sequence.stats(),
+        "similarity_index": similarity_index.stats(),
+        "analytics_cache": analytics_cache.stats(),
+        "escalation": escalation_scheduler.stats(),
+        "assignment": assignment_engine.stats(),
+        "notification_stream": broker.stats()
+    }
+
+@system_router.get("/indexes")
+async def get_index_report(current_user: dict = Depends(require_role(["management"]))):
+    """Declared indexes that are missing, undeclared or unused"""
+    return await index_report(database.db)
+
+api_router.include_router(system_router)
+
 # Include API router
 app.include_router(api_router)
 
+@app.on_event("startup")
+async def startup_db_client():
+    database.connect()
+    if os.environ.get('ENSURE_INDEXES_ON_STARTUP', 'true').lower() == 'true':
+        try:
+            result = await ensure_indexes(database.db)
+            logger.info(f"Ensured {result['applied']} indexes ({len(result['errors'])} errors)")
+        except Exception as e:
+            logger.error(f"Index creation failed: {e}")
+    await job_queue.start(database.db)
+    await view_counter.start(database.db)
+    await similarity_index.start(database.db)
+    await escalation_scheduler.start(database.db)
+    await assignment_engine.start(database.db)
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
+    await job_queue.stop()
+    await view_counter.stop()
+    await similarity_index.stop()
+    await escalation_scheduler.stop()
+    await assignment_engine.stop()
+    await broker.stop()
+    database.close()
 
 @app.get("/health")
 async def health_check():
     try:
         # Check DB connection
-        await client.admin.command('ping')
+        await database.client.admin.command('ping')
         return {"status": "healthy", "database": "connected", "timestamp": datetime.now(timezone.utc).isoformat()}
     except Exception as e:
         logger.error(f"Health check failed: {e}")
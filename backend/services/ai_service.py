@@ -1,16 +1,40 @@
 import os
+import asyncio
+import time
 from dotenv import load_dotenv
 from typing import Optional, List, Dict
 import json
 from google import genai
 from google.genai import types
+from utils.circuit_breaker import CircuitBreaker
 
 load_dotenv()
 
+GEMINI_MODEL = 'gemini-2.0-flash'
+
+class AIUnavailableError(Exception):
+    """Raised when a model call is skipped because the circuit breaker is open"""
+
 class AIService:
     def __init__(self):
         self.api_key = os.getenv("GEMINI_API_KEY")
         self.client = None
+        self.timeout_seconds = float(os.getenv("AI_TIMEOUT_SECONDS", 8))
+        self.max_concurrency = int(os.getenv("AI_MAX_CONCURRENCY", 4))
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self.breaker = CircuitBreaker(
+            failure_threshold=int(os.getenv("AI_BREAKER_FAILURE_THRESHOLD", 5)),
+            reset_timeout_seconds=float(os.getenv("AI_BREAKER_RESET_SECONDS", 30))
+        )
+        self.metrics = {
+            "calls": 0,
+            "successes": 0,
+            "failures": 0,
+            "timeouts": 0,
+            "in_flight": 0,
+            "total_latency_ms": 0.0,
+            "max_latency_ms": 0.0
+        }
         
         if self.api_key:
             try:
@@ -18,6 +42,67 @@ class AIService:
             except Exception as e:
                 print(f"Failed to initialize Gemini client: {e}")
 
+    async def _generate(self, contents: str) -> str:
+        """Call the model without blocking the event loop.
+
+        The timeout covers both waiting for a concurrency slot and the call
+        itself, so a saturated or slow upstream fails fast to the fallback.
+        """
+        if not self.breaker.allow_request():
+            raise AIUnavailableError("Circuit breaker open")
+
+        async def call():
+            async with self._semaphore:
+                self.metrics["in_flight"] += 1
+                try:
+                    return await self.client.aio.models.generate_content(
+                        model=GEMINI_MODEL,
+                        contents=contents
+                    )
+                finally:
+                    self.metrics["in_flight"] -= 1
+
+        self.metrics["calls"] += 1
+        started = time.monotonic()
+        try:
+            response = await asyncio.wait_for(call(), timeout=self.timeout_seconds)
+        except asyncio.CancelledError:
+            # Says nothing about the upstream, but a half-open trial must not stay claimed
+            self.breaker.release()
+            raise
+        except asyncio.TimeoutError:
+            self.metrics["timeouts"] += 1
+            self.metrics["failures"] += 1
+            self.breaker.record_failure()
+            raise
+        except Exception:
+            self.metrics["failures"] += 1
+            self.breaker.record_failure()
+            raise
+
+        latency_ms = (time.monotonic() - started) * 1000
+        self.metrics["successes"] += 1
+        self.metrics["total_latency_ms"] += latency_ms
+        self.metrics["max_latency_ms"] = max(self.metrics["max_latency_ms"], latency_ms)
+        self.breaker.record_success()
+        return response.text
+
+    def stats(self) -> dict:
+        successes = self.metrics["successes"]
+        return {
+            "enabled": self.client is not None,
+            "timeout_seconds": self.timeout_seconds,
+            "max_concurrency": self.max_concurrency,
+            "calls": self.metrics["calls"],
+            "successes": successes,
+            "failures": self.metrics["failures"],
+            "timeouts": self.metrics["timeouts"],
+            "in_flight": self.metrics["in_flight"],
+            "avg_latency_ms": round(self.metrics["total_latency_ms"] / successes, 1) if successes else 0,
+            "max_latency_ms": round(self.metrics["max_latency_ms"], 1),
+            "circuit_breaker": self.breaker.stats()
+        }
+
     async def get_chat_response(self, session_id: str, user_message: str, user_context: dict, message_history: List[Dict] = None) -> str:
         """AI chat response using Gemini with fallback"""
         if self.client:
@@ -36,13 +121,9 @@ Keep answers concise and helpful. If unsure, suggest contacting the warden.
 
 User Question: {user_message}"""
 
-                response = self.client.models.generate_content(
-                    model='gemini-2.0-flash',
-                    contents=system_prompt
-                )
-                return response.text
+                return await self._generate(system_prompt)
             except Exception as e:
-                print(f"AI API Error: {str(e)}")
+                print(f"AI API Error: {e!r}")
                 # Fallback to keyword matching
                 pass
 
@@ -101,8 +182,14 @@ User Question: {user_message}"""
         else:
             return "I can help with Issues, Mess, Gate Pass, Laundry, and Marketplace. Could you please rephrase your question?"
 
-    async def predict_issue_category(self, title: str, description: str) -> dict:
-        """Predict category using AI with fallback"""
+    async def predict_issue_category(self, title: str, description: str, fallback: bool = True) -> dict:
+        """Predict category using AI with fallback.
+
+        With `fallback=False` model errors (timeout, open breaker, bad JSON)
+        are raised instead of answered with the keyword guess, so a caller
+        that can retry later gets the chance to. `source` tells which of the
+        two produced the prediction.
+        """
         if self.client:
             try:
                 prompt = f"""Analyze this hostel issue and categorize it.
@@ -115,19 +202,18 @@ Respond in JSON format with:
 - confidence: Float 0.0-1.0
 - estimated_hours: Int (hours to fix)
 """
-                response = self.client.models.generate_content(
-                    model='gemini-2.0-flash',
-                    contents=prompt
-                )
+                text = await self._generate(prompt)
                 # Clean markdown if present
-                text = response.text.replace('```json', '').replace('```', '')
-                return json.loads(text)
+                text = text.replace('```json', '').replace('```', '')
+                return {**json.loads(text), "source": "model"}
             except Exception as e:
-                print(f"AI Prediction Error: {str(e)}")
-                # Fallback
-                pass
+                print(f"AI Prediction Error: {e!r}")
+                if not fallback:
+                    raise
 
-        # Fallback Logic
+        return self._keyword_prediction(title, description)
+
+    def _keyword_prediction(self, title: str, description: str) -> dict:
         combined_text = (title + " " + description).lower()
         
         if any(word in combined_text for word in ['water', 'pipe', 'leak', 'drainage', 'tap', 'shower']):
@@ -156,7 +242,8 @@ Respond in JSON format with:
             "category": category,
             "priority": priority,
             "confidence": 0.7,
-            "estimated_hours": 24
+            "estimated_hours": 24,
+            "source": "keyword"
         }
 
 ai_service = AIService()
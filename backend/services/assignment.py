@@ -0,0 +1,244 @@
+import asyncio
+import logging
+import os
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from zoneinfo import ZoneInfo
+from models.issue import OPEN_STATUSES
+
+logger = logging.getLogger(__name__)
+
+AreaKey = Tuple[str, str, str]
+
+# Any block / any hostel in the area index
+ANY = "*"
+
+# Issue categories that are named differently from the staff expertise
+# covering them; anything not listed here or matching an expertise is General
+CATEGORY_EXPERTISE = {"Cleanliness": "Cleaning", "Furniture": "Carpentry"}
+
+PRIORITY_ORDER = {"Emergency": 0, "High": 1, "Medium": 2, "Low": 3}
+
+def _value(field) -> str:
+    return str(getattr(field, "value", field) or "")
+
+def _minutes(hhmm: str) -> Optional[int]:
+    try:
+        hours, minutes = hhmm.split(":")[:2]
+        return int(hours) * 60 + int(minutes)
+    except (AttributeError, ValueError):
+        return None
+
+class AssignmentEngine:
+    """Picks assignees for issues from an in-memory index of management staff.
+
+    Staff are indexed by (expertise, hostel, block) from their `expertise` and
+    `assigned_areas`; staff without areas cover every hostel. Each person's
+    open-issue load is kept in memory, so a decision is a few dictionary
+    lookups: the least loaded on-shift member with the expertise matching the
+    issue's category in its hostel and block, falling back to General.
+    Shift times are read in `ASSIGNMENT_TIMEZONE` (default UTC); staff without
+    a shift are always on shift.
+
+    Staff and loads are reloaded every `ASSIGNMENT_REFRESH_SECONDS` (one query
+    each), which also corrects drift from assignments and closures made by
+    other processes in between.
+    """
+
+    def __init__(self):
+        self.enabled = os.environ.get('AUTO_ASSIGN_ISSUES', 'true').lower() == 'true'
+        self.refresh_interval_seconds = float(os.environ.get('ASSIGNMENT_REFRESH_SECONDS', 60))
+        self.tz = ZoneInfo(os.environ.get('ASSIGNMENT_TIMEZONE', 'UTC'))
+        self._staff: Dict[str, dict] = {}
+        self._by_area: Dict[AreaKey, Set[str]] = defaultdict(set)
+        self._load: Counter = Counter()
+        self._db = None
+        self._task: Optional[asyncio.Task] = None
+        self.metrics = {
+            "decisions": 0,
+            "no_candidate": 0,
+            "candidates_scored": 0,
+            "refreshes": 0,
+            "refresh_errors": 0
+        }
+
+    # ----- index -----
+
+    def _index(self, staff: Iterable[dict]):
+        entries, by_area = {}, defaultdict(set)
+        for user in staff:
+            expertise = [_value(e) for e in user.get("expertise") or []]
+            if not expertise:
+                continue
+            shift = user.get("shift_timing") or {}
+            entries[user["id"]] = {
+                "id": user["id"],
+                "name": user["name"],
+                "shift": (_minutes(shift.get("start")), _minutes(shift.get("end")))
+            }
+            areas = [
+                (area["hostel"], block)
+                for area in user.get("assigned_areas") or []
+                for block in area.get("blocks") or [ANY]
+            ] or [(ANY, ANY)]
+            for skill in expertise:
+                for hostel, block in areas:
+                    by_area[(skill, hostel, block)].add(user["id"])
+        self._staff, self._by_area = entries, by_area
+
+    def on_shift(self, staff_id: str, now: Optional[datetime] = None) -> bool:
+        start, end = self._staff[staff_id]["shift"]
+        if start is None or end is None or start == end:
+            return True
+        now = (now or datetime.now(self.tz)).astimezone(self.tz)
+        minute = now.hour * 60 + now.minute
+        if start < end:
+            return start <= minute < end
+        # Overnight shift, e.g. 22:00-06:00
+        return minute >= start or minute < end
+
+    def candidates(self, category: str, hostel: str, block: str) -> Set[str]:
+        """Staff covering (category, hostel, block), or General staff when nobody does"""
+        for skill in (CATEGORY_EXPERTISE.get(category, category), "General"):
+            found = set()
+            for key in ((skill, hostel, block), (skill, hostel, ANY), (skill, ANY, ANY)):
+                found |= self._by_area.get(key, set())
+            if found:
+                return found
+        return set()
+
+    # ----- decisions -----
+
+    def choose(
+        self,
+        issue: dict,
+        now: Optional[datetime] = None,
+        keep: Optional[str] = None
+    ) -> Optional[dict]:
+        """Least loaded on-shift assignee for `issue` as {"id", "name"}, or None.
+
+        Ties go to `keep` (the current assignee) so re-balancing does not
+        shuffle issues between equally loaded staff.
+        """
+        self.metrics["decisions"] += 1
+        location = issue.get("location") or {}
+        candidates = [
+            staff_id
+            for staff_id in self.candidates(_value(issue.get("category")), location.get("hostel"), location.get("block"))
+            if self.on_shift(staff_id, now)
+        ]
+        self.metrics["candidates_scored"] += len(candidates)
+        if not candidates:
+            self.metrics["no_candidate"] += 1
+            return None
+        best = min(
+            candidates,
+            key=lambda staff_id: (self._load[staff_id], staff_id != keep, self._staff[staff_id]["name"])
+        )
+        return {"id": best, "name": self._staff[best]["name"]}
+
+    def record_assignment(self, staff_id: Optional[str], previous_id: Optional[str] = None):
+        """Account for an open issue moving from `previous_id` to `staff_id`"""
+        if previous_id == staff_id:
+            return
+        if previous_id and self._load[previous_id] > 0:
+            self._load[previous_id] -= 1
+        if staff_id:
+            self._load[staff_id] += 1
+
+    def record_transition(self, staff_id: Optional[str], old_status: Optional[str], new_status: Optional[str]):
+        """Account for an assigned issue opening or closing"""
+        if not staff_id:
+            return
+        was_open, is_open = _value(old_status) in OPEN_STATUSES, _value(new_status) in OPEN_STATUSES
+        if was_open and not is_open and self._load[staff_id] > 0:
+            self._load[staff_id] -= 1
+        elif is_open and not was_open:
+            self._load[staff_id] += 1
+
+    def record_update(
+        self,
+        previous_id: Optional[str],
+        staff_id: Optional[str],
+        old_status: Optional[str],
+        new_status: Optional[str]
+    ):
+        """Account for an issue whose assignee and/or status changed in one update"""
+        if previous_id == staff_id:
+            self.record_transition(staff_id, old_status, new_status)
+            return
+        if previous_id and _value(old_status) in OPEN_STATUSES and self._load[previous_id] > 0:
+            self._load[previous_id] -= 1
+        if staff_id and _value(new_status) in OPEN_STATUSES:
+            self._load[staff_id] += 1
+
+    def plan_rebalance(self, issues: List[dict], now: Optional[datetime] = None) -> List[dict]:
+        """Redistribute open `issues` across staff, most urgent and oldest first.
+
+        Returns the issues whose assignee changes as
+        {"issue_id", "previous_id", "assignee"}; the in-memory loads are
+        updated as if the plan were applied.
+        """
+        for issue in issues:
+            self.record_assignment(None, issue.get("assigned_to"))
+        issues = sorted(issues, key=lambda i: (PRIORITY_ORDER.get(_value(i.get("priority")), 4), i.get("reported_at") or ""))
+        changes = []
+        for issue in issues:
+            previous = issue.get("assigned_to")
+            assignee = self.choose(issue, now, keep=previous)
+            if assignee is None:
+                # Nobody suitable on shift: leave the issue where it was
+                self.record_assignment(previous)
+                continue
+            self.record_assignment(assignee["id"])
+            if assignee["id"] != previous:
+                changes.append({"issue_id": issue["id"], "previous_id": previous, "assignee": assignee})
+        return changes
+
+    # ----- loading -----
+
+    async def refresh(self):
+        staff = await self._db.users.find(
+            {"role": "management", "is_active": {"$ne": False}},
+            {"_id": 0, "id": 1, "name": 1, "expertise": 1, "assigned_areas": 1, "shift_timing": 1}
+        ).to_list(None)
+        loads = await self._db.issues.aggregate([
+            {"$match": {"status": {"$in": OPEN_STATUSES}, "assigned_to": {"$ne": None}}},
+            {"$group": {"_id": "$assigned_to", "count": {"$sum": 1}}}
+        ]).to_list(None)
+        self._index(staff)
+        self._load = Counter({row["_id"]: row["count"] for row in loads})
+        self.metrics["refreshes"] += 1
+
+    async def start(self, db):
+        if self._task is not None:
+            return
+        self._db = db
+        self._task = asyncio.create_task(self._refresher())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _refresher(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                self.metrics["refresh_errors"] += 1
+                logger.error(f"Assignment index refresh failed: {e}")
+            await asyncio.sleep(self.refresh_interval_seconds)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self.enabled,
+            "staff": len(self._staff),
+            "area_keys": len(self._by_area),
+            "open_assigned": sum(self._load.values()),
+            **self.metrics
+        }
+
+assignment_engine = AssignmentEngine()
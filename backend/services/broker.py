@@ -0,0 +1,153 @@
+import asyncio
+import logging
+import os
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+class Subscription:
+    """Events published to any of `channels`, in publish order.
+
+    A subscriber that falls more than the queue size behind is closed rather
+    than buffered without limit; it is expected to reconnect and replay what
+    it missed from the database.
+    """
+
+    _CLOSED = object()
+
+    def __init__(self, channels: Iterable[str], queue_size: int):
+        self.channels: Set[str] = set(channels)
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.closed = False
+
+    def put(self, event: dict) -> bool:
+        if self.closed:
+            return False
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self.close()
+            return False
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        # Make room for the sentinel so a waiting get() always wakes up
+        while self._queue.full():
+            self._queue.get_nowait()
+        self._queue.put_nowait(self._CLOSED)
+
+    async def get(self, timeout: Optional[float] = None) -> Optional[dict]:
+        """Next event, None on timeout; raises EOFError once closed"""
+        try:
+            event = await asyncio.wait_for(self._queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if event is self._CLOSED:
+            raise EOFError
+        return event
+
+class Broker(ABC):
+    """Publish/subscribe interface used for pushing events to connected clients.
+
+    Implementations for a multi-worker deployment (e.g. on Redis pub/sub)
+    subclass this and are selected with `PUBSUB_BACKEND`; see create_broker.
+    """
+
+    def __init__(self):
+        self.queue_size = int(os.environ.get('PUBSUB_QUEUE_SIZE', 100))
+        self.metrics = {
+            "published": 0,
+            "delivered": 0,
+            "slow_consumers_closed": 0,
+            "connections_total": 0,
+            "connections_peak": 0
+        }
+
+    @abstractmethod
+    async def publish(self, channel: str, event: dict):
+        """Deliver `event` to every subscription listening on `channel`"""
+
+    @abstractmethod
+    def subscribe(self, channels: Iterable[str]) -> Subscription:
+        """Open a subscription receiving events published to any of `channels`"""
+
+    @abstractmethod
+    def unsubscribe(self, subscription: Subscription):
+        """Stop delivering to `subscription` and close it; safe to call twice"""
+
+    async def stop(self):
+        pass
+
+    def stats(self) -> dict:
+        return dict(self.metrics)
+
+class InProcessBroker(Broker):
+    """Broker delivering to subscribers of this process only.
+
+    With several workers, a client only receives events published by the
+    worker it is connected to; the rest reach it on reconnect through replay.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._subscribers: Dict[str, Set[Subscription]] = defaultdict(set)
+        self._subscriptions: Set[Subscription] = set()
+
+    async def publish(self, channel: str, event: dict):
+        self.metrics["published"] += 1
+        for subscription in list(self._subscribers.get(channel, ())):
+            if subscription.put(event):
+                self.metrics["delivered"] += 1
+            else:
+                self.metrics["slow_consumers_closed"] += 1
+                self.unsubscribe(subscription)
+
+    def subscribe(self, channels: Iterable[str]) -> Subscription:
+        subscription = Subscription(channels, self.queue_size)
+        for channel in subscription.channels:
+            self._subscribers[channel].add(subscription)
+        self._subscriptions.add(subscription)
+        self.metrics["connections_total"] += 1
+        self.metrics["connections_peak"] = max(self.metrics["connections_peak"], len(self._subscriptions))
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        if subscription not in self._subscriptions:
+            return
+        self._subscriptions.discard(subscription)
+        for channel in subscription.channels:
+            subscribers = self._subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[channel]
+        subscription.close()
+
+    async def stop(self):
+        # Ends open streams so the server can shut down
+        for subscription in list(self._subscriptions):
+            self.unsubscribe(subscription)
+
+    def stats(self) -> dict:
+        return {
+            "backend": "memory",
+            "connections": len(self._subscriptions),
+            "channels": len(self._subscribers),
+            **self.metrics
+        }
+
+BROKER_BACKENDS = {"memory": InProcessBroker}
+
+def create_broker() -> Broker:
+    backend = os.environ.get('PUBSUB_BACKEND', 'memory')
+    if backend not in BROKER_BACKENDS:
+        logger.error(f"Unknown PUBSUB_BACKEND {backend!r}, using memory")
+        backend = "memory"
+    return BROKER_BACKENDS[backend]()
+
+broker = create_broker()
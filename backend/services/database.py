@@ -0,0 +1,135 @@
+import os
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import monitoring
+
+ROOT_DIR = Path(__file__).parent.parent
+load_dotenv(ROOT_DIR / '.env')
+
+logger = logging.getLogger(__name__)
+
+class PoolStatsListener(monitoring.ConnectionPoolListener):
+    """Counts connection pool events reported by the driver.
+
+    Events arrive on the driver's worker threads, so counters are guarded by a lock.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.open_connections = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.total_checkouts = 0
+        self.checkout_failures = 0
+        self.pool_clears = 0
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open_connections += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open_connections = max(0, self.open_connections - 1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.checked_out += 1
+            self.total_checkouts += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out = max(0, self.checked_out - 1)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "open_connections": self.open_connections,
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+                "total_checkouts": self.total_checkouts,
+                "checkout_failures": self.checkout_failures,
+                "pool_clears": self.pool_clears
+            }
+
+class DatabaseProvider:
+    """Owns the single application-wide Mongo client and its connection pool"""
+
+    def __init__(self):
+        self.max_pool_size = int(os.environ.get('MONGO_MAX_POOL_SIZE', 50))
+        self.min_pool_size = int(os.environ.get('MONGO_MIN_POOL_SIZE', 0))
+        self.max_idle_time_ms = int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', 60000))
+        self.wait_queue_timeout_ms = int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', 5000))
+        self.pool_listener = PoolStatsListener()
+        self._client: Optional[AsyncIOMotorClient] = None
+
+    @property
+    def client(self) -> AsyncIOMotorClient:
+        if self._client is None:
+            self._client = AsyncIOMotorClient(
+                os.environ['MONGO_URL'],
+                maxPoolSize=self.max_pool_size,
+                minPoolSize=self.min_pool_size,
+                maxIdleTimeMS=self.max_idle_time_ms,
+                waitQueueTimeoutMS=self.wait_queue_timeout_ms,
+                event_listeners=[self.pool_listener]
+            )
+        return self._client
+
+    @property
+    def db(self) -> AsyncIOMotorDatabase:
+        return self.client[os.environ['DB_NAME']]
+
+    def connect(self):
+        """Create the client (if needed) when the application starts"""
+        client = self.client
+        logger.info(
+            f"MongoDB client ready (maxPoolSize={self.max_pool_size}, minPoolSize={self.min_pool_size})"
+        )
+        return client
+
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
+
+    def stats(self) -> dict:
+        return {
+            "max_pool_size": self.max_pool_size,
+            "min_pool_size": self.min_pool_size,
+            "connected": self._client is not None,
+            **self.pool_listener.snapshot()
+        }
+
+database = DatabaseProvider()
+
+def get_db() -> AsyncIOMotorDatabase:
+    """FastAPI dependency returning the shared application database"""
+    return database.db
@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import os
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+from models.issue import OPEN_STATUSES
+from services.notifications import build_notification, notify, role_audience
+
+logger = logging.getLogger(__name__)
+
+class EscalationScheduler:
+    """Periodically escalates open issues that have breached their SLA.
+
+    Every `ESCALATION_SWEEP_SECONDS` one sweep claims all open issues reported
+    longer ago than their priority's SLA (`SLA_HOURS_<PRIORITY>`) and not yet
+    escalated, then emits their ESCALATION notifications with a single
+    insert_many. Claiming is one update_many that stamps the issues with the
+    sweep id, so concurrent processes never escalate an issue twice. The
+    queries only touch open issues through the (status, priority, reported_at)
+    index.
+    """
+
+    DEFAULT_SLA_HOURS = {"Emergency": 1, "High": 4, "Medium": 24, "Low": 72}
+
+    def __init__(self):
+        self.sweep_interval_seconds = float(os.environ.get('ESCALATION_SWEEP_SECONDS', 300))
+        self.sla_hours: Dict[str, float] = {
+            priority: float(os.environ.get(f'SLA_HOURS_{priority.upper()}', default))
+            for priority, default in self.DEFAULT_SLA_HOURS.items()
+        }
+        self._db = None
+        self._task: Optional[asyncio.Task] = None
+        self.metrics = {
+            "sweeps": 0,
+            "errors": 0,
+            "escalated": 0,
+            "notifications": 0,
+            "last_sweep_at": None,
+            "last_sweep_ms": None,
+            "last_sweep_escalated": 0
+        }
+
+    def _overdue_filter(self, now: datetime) -> dict:
+        return {"$or": [
+            {
+                "status": {"$in": OPEN_STATUSES},
+                "priority": priority,
+                "reported_at": {"$lt": (now - timedelta(hours=hours)).isoformat()}
+            }
+            for priority, hours in self.sla_hours.items()
+        ]}
+
+    async def sweep(self) -> int:
+        started = time.perf_counter()
+        now = datetime.now(timezone.utc)
+        sweep_id = str(uuid.uuid4())
+        overdue = self._overdue_filter(now)
+
+        claimed = await self._db.issues.update_many(
+            {**overdue, "escalated_at": {"$exists": False}},
+            {"$set": {"escalated_at": now.isoformat(), "escalation_sweep": sweep_id}}
+        )
+        notifications = []
+        if claimed.modified_count:
+            cursor = self._db.issues.find(
+                {**overdue, "escalation_sweep": sweep_id},
+                {"_id": 0, "id": 1, "ticket_id": 1, "title": 1, "priority": 1, "location": 1,
+                 "assigned_to": 1, "reported_at": 1}
+            )
+            async for issue in cursor:
+                notifications.extend(self._notifications_for(issue, now))
+            await notify(self._db, notifications)
+
+        self.metrics["sweeps"] += 1
+        self.metrics["escalated"] += claimed.modified_count
+        self.metrics["notifications"] += len(notifications)
+        self.metrics["last_sweep_at"] = now.isoformat()
+        self.metrics["last_sweep_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        self.metrics["last_sweep_escalated"] = claimed.modified_count
+        return claimed.modified_count
+
+    def _notifications_for(self, issue: dict, now: datetime) -> list:
+        location = issue.get("location") or {}
+        message = (
+            f"{issue['ticket_id']} ({issue['priority']}) in {location.get('hostel', 'N/A')} "
+            f"has been open longer than its {self.sla_hours.get(issue['priority'], 0):g}h SLA: {issue['title']}"
+        )
+        recipients = [role_audience("management")]
+        if issue.get("assigned_to"):
+            recipients.append(issue["assigned_to"])
+        return [
+            build_notification(
+                recipient, "ESCALATION", "SLA Breached", message,
+                link=f"/issues/{issue['id']}",
+                priority=issue["priority"],
+                related_issue=issue["id"]
+            )
+            for recipient in recipients
+        ]
+
+    async def start(self, db):
+        if self._task is not None:
+            return
+        self._db = db
+        self._task = asyncio.create_task(self._scheduler())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _scheduler(self):
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                self.metrics["errors"] += 1
+                logger.error(f"Escalation sweep failed: {e}")
+            await asyncio.sleep(self.sweep_interval_seconds)
+
+    def stats(self) -> dict:
+        return {"sla_hours": self.sla_hours, **self.metrics}
+
+escalation_scheduler = EscalationScheduler()
@@ -0,0 +1,223 @@
+"""Declarative registry of MongoDB indexes.
+
+Every index the application relies on is declared here, per collection. The
+registry is applied idempotently at startup and can be applied or audited from
+the command line:
+
+    python -m services.indexes apply
+    python -m services.indexes report
+"""
+import asyncio
+import logging
+import sys
+from typing import Dict, List
+from pymongo import IndexModel, ASCENDING, DESCENDING, TEXT
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+        IndexModel([("role", ASCENDING), ("hostel", ASCENDING)], name="role_hostel"),
+    ],
+    "issues": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("ticket_id", ASCENDING)], name="ticket_id_unique", unique=True),
+        IndexModel(
+            [("visibility", ASCENDING), ("response_time_hours", ASCENDING)],
+            name="visibility_response_time"
+        ),
+        IndexModel(
+            [("title", TEXT), ("description", TEXT)],
+            name="title_description_text",
+            weights={"title": 3, "description": 1}
+        ),
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_at_id"),
+        IndexModel(
+            [("reporter_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+            name="reporter_created_at_id"
+        ),
+        IndexModel(
+            [("location.hostel", ASCENDING), ("visibility", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+            name="hostel_visibility_created_at_id"
+        ),
+        IndexModel(
+            [("status", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+            name="status_created_at_id"
+        ),
+        IndexModel(
+            [("status", ASCENDING), ("priority", ASCENDING), ("reported_at", ASCENDING)],
+            name="status_priority_reported_at"
+        ),
+        IndexModel([("status", ASCENDING), ("assigned_to", ASCENDING)], name="status_assigned_to"),
+    ],
+    "comments": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel(
+            [("issue_id", ASCENDING), ("created_at", ASCENDING), ("id", ASCENDING)],
+            name="issue_created_at_id"
+        ),
+    ],
+    "notifications": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel(
+            [("recipient", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+            name="recipient_created_at_id"
+        ),
+        IndexModel(
+            [("recipient", ASCENDING), ("created_at", DESCENDING)],
+            name="recipient_unread_created_at",
+            partialFilterExpression={"is_read": False}
+        ),
+    ],
+    "attendance": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("student_id", ASCENDING), ("date", DESCENDING)], name="student_date"),
+        IndexModel([("hostel", ASCENDING), ("date", DESCENDING)], name="hostel_date"),
+    ],
+    "gate_passes": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("student_id", ASCENDING), ("status", ASCENDING)], name="student_status"),
+        IndexModel(
+            [("student_id", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+            name="student_created_at_id"
+        ),
+        IndexModel(
+            [("status", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+            name="status_created_at_id"
+        ),
+    ],
+    "mess_menu": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("day", ASCENDING), ("meal_type", ASCENDING)], name="day_meal_unique", unique=True),
+    ],
+    "polls": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("is_active", ASCENDING), ("created_at", DESCENDING)], name="active_created_at"),
+    ],
+    "laundry": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel(
+            [("block", ASCENDING), ("floor", ASCENDING), ("machine_number", ASCENDING)],
+            name="block_floor_machine"
+        ),
+    ],
+    "marketplace": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel(
+            [("status", ASCENDING), ("created_at", DESCENDING), ("id", DESCENDING)],
+            name="status_created_at_id"
+        ),
+    ],
+    "lost_found": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("created_at", DESCENDING), ("id", DESCENDING)], name="created_at_id"),
+    ],
+    "announcements": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("is_pinned", DESCENDING), ("created_at", DESCENDING)], name="pinned_created_at"),
+    ],
+    "jobs": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("status", ASCENDING), ("next_run_at", ASCENDING)], name="status_next_run_at"),
+        IndexModel([("status", ASCENDING), ("locked_until", ASCENDING)], name="status_locked_until"),
+        IndexModel(
+            [("updated_at", ASCENDING)],
+            name="done_ttl",
+            expireAfterSeconds=7 * 24 * 3600,
+            partialFilterExpression={"status": "done"}
+        ),
+    ],
+    "issue_stats": [
+        IndexModel(
+            [("visibility", ASCENDING), ("hostel", ASCENDING), ("block", ASCENDING),
+             ("category", ASCENDING), ("priority", ASCENDING), ("status", ASCENDING), ("day", ASCENDING)],
+            name="bucket_unique",
+            unique=True
+        ),
+        IndexModel([("visibility", ASCENDING), ("day", ASCENDING)], name="visibility_day"),
+    ],
+    "counters": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+    ],
+    "notification_reads": [
+        IndexModel([("user_id", ASCENDING)], name="user_id_unique", unique=True),
+    ],
+    "ai_conversations": [
+        IndexModel([("user_id", ASCENDING), ("session_id", ASCENDING)], name="user_session"),
+    ],
+}
+
+async def ensure_indexes(db) -> dict:
+    """Create every declared index that does not exist yet.
+
+    createIndexes is a no-op for indexes that already exist with the same
+    definition, so this is safe to run on every startup. Failures (e.g. a
+    unique index over existing duplicates) are logged and reported instead of
+    aborting the remaining indexes.
+    """
+    result = {"applied": 0, "errors": []}
+    for collection_name, models in INDEXES.items():
+        for model in models:
+            try:
+                await db[collection_name].create_indexes([model])
+                result["applied"] += 1
+            except OperationFailure as e:
+                name = model.document["name"]
+                logger.error(f"Failed to create index {collection_name}.{name}: {e}")
+                result["errors"].append({"collection": collection_name, "index": name, "error": str(e)})
+    return result
+
+async def index_report(db) -> dict:
+    """Compare declared indexes with the database.
+
+    Reports declared indexes that are missing, existing indexes that are not
+    declared, and indexes with no recorded usage since the server started.
+    """
+    report = {}
+    for collection_name, models in INDEXES.items():
+        collection = db[collection_name]
+        declared = {model.document["name"] for model in models}
+        existing = set((await collection.index_information()).keys())
+        existing.discard("_id_")
+
+        unused = []
+        try:
+            async for stat in collection.aggregate([{"$indexStats": {}}]):
+                if stat["name"] != "_id_" and stat.get("accesses", {}).get("ops", 0) == 0:
+                    unused.append(stat["name"])
+        except OperationFailure as e:
+            logger.warning(f"$indexStats unavailable for {collection_name}: {e}")
+
+        report[collection_name] = {
+            "missing": sorted(declared - existing),
+            "undeclared": sorted(existing - declared),
+            "unused": sorted(unused)
+        }
+    return report
+
+async def _main(command: str):
+    from services.database import database
+
+    db = database.db
+    try:
+        if command == "apply":
+            result = await ensure_indexes(db)
+            print(f"Applied {result['applied']} indexes, {len(result['errors'])} errors")
+            for error in result["errors"]:
+                print(f"  {error['collection']}.{error['index']}: {error['error']}")
+        elif command == "report":
+            report = await index_report(db)
+            for collection_name, entry in report.items():
+                print(collection_name)
+                for key in ("missing", "undeclared", "unused"):
+                    print(f"  {key}: {', '.join(entry[key]) or '-'}")
+        else:
+            print("Usage: python -m services.indexes [apply|report]")
+    finally:
+        database.close()
+
+if __name__ == "__main__":
+    asyncio.run(_main(sys.argv[1] if len(sys.argv) > 1 else "apply"))
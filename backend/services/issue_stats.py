@@ -0,0 +1,162 @@
+"""Incrementally maintained issue counts.
+
+`issue_stats` holds one document per (hostel, block, category, priority,
+status, visibility, day) bucket with the number of issues currently in it;
+`day` is the day the issue was reported. Every issue stores the bucket it is
+counted in as `stats_key`. Issue updates go through `track_stats`, which
+records the previous key next to the new one in the same atomic write, so
+each transition moves exactly one count between buckets.
+
+Rebuild the rollups from the issues collection (e.g. after deploying or if
+counts drift) from `backend/`:
+
+    python -m services.issue_stats rebuild
+"""
+import asyncio
+import sys
+from datetime import date, timedelta
+from typing import Dict, List, Optional
+from pymongo import UpdateOne
+
+def _value(field):
+    return getattr(field, "value", field)
+
+def stats_key(issue: dict) -> Dict[str, Optional[str]]:
+    """Bucket key of an issue document"""
+    location = issue.get("location") or {}
+    reported_at = issue.get("reported_at")
+    if not isinstance(reported_at, str):
+        reported_at = reported_at.isoformat() if reported_at else ""
+    return {
+        "hostel": location.get("hostel"),
+        "block": location.get("block"),
+        "category": _value(issue.get("category")),
+        "priority": _value(issue.get("priority")),
+        "status": _value(issue.get("status")),
+        "visibility": _value(issue.get("visibility")),
+        "day": reported_at[:10]
+    }
+
+def stats_key_expression() -> dict:
+    """Aggregation expression computing stats_key from the document itself"""
+    return {
+        "hostel": "$location.hostel",
+        "block": "$location.block",
+        "category": "$category",
+        "priority": "$priority",
+        "status": "$status",
+        "visibility": "$visibility",
+        "day": {"$substrCP": [{"$toString": "$reported_at"}, 0, 10]}
+    }
+
+def track_stats(pipeline: List[dict]) -> List[dict]:
+    """Wrap an issue update pipeline so the document records its old and new bucket"""
+    return [
+        {"$set": {"stats_key_before": "$stats_key"}},
+        *pipeline,
+        {"$set": {"stats_key": stats_key_expression()}}
+    ]
+
+async def record_created(db, issue: dict):
+    await db.issue_stats.update_one(issue["stats_key"], {"$inc": {"count": 1}}, upsert=True)
+
+async def record_transitions(db, issues: List[dict]):
+    """Move counts for updated issues returned with stats_key_before/stats_key"""
+    operations = []
+    for issue in issues:
+        before, after = issue.get("stats_key_before"), issue.get("stats_key")
+        # Issues created before the rollups existed are picked up by a rebuild
+        if not before or not after or before == after:
+            continue
+        operations.append(UpdateOne(before, {"$inc": {"count": -1}}, upsert=True))
+        operations.append(UpdateOne(after, {"$inc": {"count": 1}}, upsert=True))
+    if operations:
+        await db.issue_stats.bulk_write(operations, ordered=False)
+
+TREND_GROUPS = ("category", "hostel", "block", "priority", "status")
+
+def period_start(day: date, granularity: str) -> date:
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    return day
+
+def _periods(start: date, end: date, granularity: str) -> List[date]:
+    periods = []
+    current = period_start(start, granularity)
+    while current <= end:
+        periods.append(current)
+        if granularity == "month":
+            current = (current.replace(day=28) + timedelta(days=4)).replace(day=1)
+        else:
+            current += timedelta(days=7 if granularity == "week" else 1)
+    return periods
+
+async def trends(
+    db,
+    start: date,
+    end: date,
+    granularity: str = "day",
+    group_by: Optional[str] = None,
+    filters: Optional[dict] = None
+) -> List[dict]:
+    """Issues reported per period from the day buckets, one zero-filled series per group.
+
+    Buckets are summed per day in Mongo (at most days x groups rows) and
+    folded into weeks or months here.
+    """
+    match = {"visibility": "Public", "day": {"$gte": start.isoformat(), "$lte": end.isoformat()}}
+    match.update({field: value for field, value in (filters or {}).items() if value})
+    group_id = {"day": "$day"}
+    if group_by:
+        group_id["key"] = f"${group_by}"
+    rows = await db.issue_stats.aggregate([
+        {"$match": match},
+        {"$group": {"_id": group_id, "count": {"$sum": "$count"}}}
+    ]).to_list(None)
+
+    periods = _periods(start, end, granularity)
+    series: Dict[Optional[str], Dict[date, int]] = {}
+    for row in rows:
+        if not row["count"]:
+            continue
+        period = period_start(date.fromisoformat(row["_id"]["day"]), granularity)
+        counts = series.setdefault(row["_id"].get("key"), {})
+        counts[period] = counts.get(period, 0) + row["count"]
+    if not series and not group_by:
+        series[None] = {}
+
+    return [
+        {
+            "key": key,
+            "total": sum(counts.values()),
+            "points": [{"period": p.isoformat(), "count": counts.get(p, 0)} for p in periods]
+        }
+        for key, counts in sorted(series.items(), key=lambda item: -sum(item[1].values()))
+    ]
+
+async def rebuild(db) -> int:
+    """Recompute every issue's stats_key and replace issue_stats from scratch"""
+    await db.issues.update_many({}, [{"$set": {"stats_key": stats_key_expression()}}])
+    await db.issues.aggregate([
+        {"$group": {"_id": "$stats_key", "count": {"$sum": 1}}},
+        {"$replaceWith": {"$mergeObjects": ["$_id", {"count": "$count"}]}},
+        {"$out": "issue_stats"}
+    ]).to_list(None)
+    return await db.issue_stats.count_documents({})
+
+async def _main(command: str):
+    from services.database import database
+
+    try:
+        if command == "rebuild":
+            buckets = await rebuild(database.db)
+            print(f"Rebuilt issue_stats: {buckets} buckets")
+        else:
+            print("Usage: python -m services.issue_stats rebuild")
+    finally:
+        database.close()
+
+if __name__ == "__main__":
+    asyncio.run(_main(sys.argv[1] if len(sys.argv) > 1 else "rebuild"))
@@ -0,0 +1,182 @@
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Optional
+from pymongo import ReturnDocument
+
+logger = logging.getLogger(__name__)
+
+# Called with the job payload and whether this is the job's last attempt
+JobHandler = Callable[[dict, bool], Awaitable[None]]
+
+class JobQueue:
+    """In-process async worker queue backed by the Mongo `jobs` collection.
+
+    Jobs are written to Mongo before they are queued in memory, so work
+    survives restarts: on startup and on every poll, due jobs (and jobs whose
+    lease expired because a worker died) are picked up again. Jobs are claimed
+    with an atomic find_one_and_update, so several processes can share the
+    collection. Failed jobs are retried with exponential backoff.
+    """
+
+    def __init__(self):
+        self.concurrency = int(os.environ.get('JOB_WORKERS', 2))
+        self.max_attempts = int(os.environ.get('JOB_MAX_ATTEMPTS', 5))
+        self.base_backoff_seconds = float(os.environ.get('JOB_BACKOFF_SECONDS', 5))
+        self.lease_seconds = float(os.environ.get('JOB_LEASE_SECONDS', 120))
+        self.poll_interval_seconds = float(os.environ.get('JOB_POLL_SECONDS', 10))
+        self._handlers: Dict[str, JobHandler] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._queued_ids = set()
+        self._tasks = []
+        self._db = None
+        self.metrics = {
+            "enqueued": 0,
+            "completed": 0,
+            "retried": 0,
+            "failed": 0,
+            "in_flight": 0
+        }
+
+    def register(self, job_type: str, handler: JobHandler):
+        self._handlers[job_type] = handler
+
+    async def enqueue(self, job_type: str, payload: dict) -> str:
+        job_id = str(uuid.uuid4())
+        now = datetime.now(timezone.utc)
+        await self._db.jobs.insert_one({
+            "id": job_id,
+            "type": job_type,
+            "payload": payload,
+            "status": "pending",
+            "attempts": 0,
+            "last_error": None,
+            "next_run_at": now,
+            "locked_until": None,
+            "created_at": now,
+            "updated_at": now
+        })
+        self.metrics["enqueued"] += 1
+        self._put(job_id)
+        return job_id
+
+    def _put(self, job_id: str):
+        # The poller rediscovers jobs that are already waiting in memory
+        if self._queue is not None and job_id not in self._queued_ids:
+            self._queued_ids.add(job_id)
+            self._queue.put_nowait(job_id)
+
+    async def start(self, db):
+        if self._queue is not None:
+            return
+        self._db = db
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        self._tasks.append(asyncio.create_task(self._poller()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+        self._queued_ids.clear()
+
+    async def _poller(self):
+        while True:
+            try:
+                now = datetime.now(timezone.utc)
+                cursor = self._db.jobs.find(
+                    {"$or": [
+                        {"status": "pending", "next_run_at": {"$lte": now}},
+                        {"status": "running", "locked_until": {"$lt": now}}
+                    ]},
+                    {"_id": 0, "id": 1}
+                ).limit(500)
+                async for job in cursor:
+                    self._put(job["id"])
+            except Exception as e:
+                logger.error(f"Job poll failed: {e}")
+            await asyncio.sleep(self.poll_interval_seconds)
+
+    async def _claim(self, job_id: str) -> Optional[dict]:
+        now = datetime.now(timezone.utc)
+        return await self._db.jobs.find_one_and_update(
+            {"id": job_id, "$or": [
+                {"status": "pending", "next_run_at": {"$lte": now}},
+                {"status": "running", "locked_until": {"$lt": now}}
+            ]},
+            {
+                "$set": {
+                    "status": "running",
+                    "locked_until": now + timedelta(seconds=self.lease_seconds),
+                    "updated_at": now
+                },
+                "$inc": {"attempts": 1}
+            },
+            projection={"_id": 0},
+            return_document=ReturnDocument.AFTER
+        )
+
+    async def _worker(self):
+        while True:
+            job_id = await self._queue.get()
+            self._queued_ids.discard(job_id)
+            try:
+                job = await self._claim(job_id)
+                if job is not None:
+                    await self._run(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job worker error for {job_id}: {e}")
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: dict):
+        handler = self._handlers.get(job["type"])
+        self.metrics["in_flight"] += 1
+        try:
+            if handler is None:
+                raise RuntimeError(f"No handler registered for job type {job['type']}")
+            await handler(job["payload"], job["attempts"] >= self.max_attempts)
+        except Exception as e:
+            await self._record_failure(job, e)
+        else:
+            self.metrics["completed"] += 1
+            await self._db.jobs.update_one(
+                {"id": job["id"]},
+                {"$set": {
+                    "status": "done",
+                    "locked_until": None,
+                    "updated_at": datetime.now(timezone.utc)
+                }}
+            )
+        finally:
+            self.metrics["in_flight"] -= 1
+
+    async def _record_failure(self, job: dict, error: Exception):
+        now = datetime.now(timezone.utc)
+        if job["attempts"] >= self.max_attempts:
+            self.metrics["failed"] += 1
+            logger.error(f"Job {job['id']} ({job['type']}) failed permanently: {error}")
+            update = {"status": "failed"}
+        else:
+            self.metrics["retried"] += 1
+            delay = self.base_backoff_seconds * (2 ** (job["attempts"] - 1))
+            logger.warning(f"Job {job['id']} ({job['type']}) failed, retrying in {delay:.0f}s: {error}")
+            update = {"status": "pending", "next_run_at": now + timedelta(seconds=delay)}
+
+        update.update({"last_error": str(error), "locked_until": None, "updated_at": now})
+        await self._db.jobs.update_one({"id": job["id"]}, {"$set": update})
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.concurrency,
+            "queue_length": self._queue.qsize() if self._queue is not None else 0,
+            **self.metrics
+        }
+
+job_queue = JobQueue()
@@ -0,0 +1,257 @@
+"""Notifications addressed to a user, a role, a hostel or a block.
+
+A notification is stored once, with `recipient` holding its audience: a user
+id, `role:<role>`, `hostel:<hostel>` (the students of that hostel) or
+`block:<hostel>/<block>` (the students of that block). A
+user's inbox is every notification whose recipient is their id or one of
+their audiences, read as one `$in` query on the (recipient, created_at, id)
+index, which Mongo merges already sorted.
+
+Direct notifications keep `is_read` on the document. Read state for shared
+(role, hostel and block) notifications lives in `notification_reads`, one small
+document per user: a `read_before` watermark plus the ids read individually
+after it. "Mark all read" moves the watermark to now; reading single
+notifications moves it up to the oldest one still unread and drops the ids it
+covers, so the list only holds notifications read out of order.
+
+Inserted notifications are also published to the broker on their recipient
+channel, from which `inbox_stream` pushes them to connected clients as
+server-sent events. Event ids are inbox cursors, so a client reconnecting
+with Last-Event-ID gets everything it missed replayed from the database.
+"""
+import logging
+import os
+import uuid
+from datetime import datetime, timezone
+from typing import AsyncIterator, Awaitable, Callable, Iterable, List, Optional
+from models.announcement import NotificationResponse
+from services.broker import broker
+from utils.pagination import encode_cursor, paginate
+
+logger = logging.getLogger(__name__)
+
+STREAM_HEARTBEAT_SECONDS = float(os.environ.get('NOTIFICATION_HEARTBEAT_SECONDS', 15))
+STREAM_REPLAY_LIMIT = int(os.environ.get('NOTIFICATION_REPLAY_LIMIT', 500))
+STREAM_RETRY_MS = 5000
+
+ROLE_PREFIX = "role:"
+HOSTEL_PREFIX = "hostel:"
+BLOCK_PREFIX = "block:"
+
+def role_audience(role: str) -> str:
+    return f"{ROLE_PREFIX}{role}"
+
+def hostel_audience(hostel: str) -> str:
+    return f"{HOSTEL_PREFIX}{hostel}"
+
+def block_audience(hostel: str, block: str) -> str:
+    return f"{BLOCK_PREFIX}{hostel}/{block}"
+
+def audience_type(recipient: str) -> str:
+    if recipient.startswith(ROLE_PREFIX):
+        return "role"
+    if recipient.startswith(HOSTEL_PREFIX):
+        return "hostel"
+    if recipient.startswith(BLOCK_PREFIX):
+        return "block"
+    return "user"
+
+def audiences_for(user: dict) -> List[str]:
+    """Shared audiences `user` belongs to (excluding their own id)"""
+    audiences = [role_audience(user["role"])]
+    # Hostel and block audiences are the students living there, as for announcements
+    if user["role"] == "student" and user.get("hostel"):
+        audiences.append(hostel_audience(user["hostel"]))
+        if user.get("block"):
+            audiences.append(block_audience(user["hostel"], user["block"]))
+    return audiences
+
+def build_notification(
+    recipient: str,
+    type: str,
+    title: str,
+    message: str,
+    link: Optional[str] = None,
+    priority: str = "Medium",
+    **related
+) -> dict:
+    """Notification document; `related` carries related_issue, related_id etc."""
+    return {
+        "id": str(uuid.uuid4()),
+        "recipient": recipient,
+        "audience": audience_type(recipient),
+        "type": type,
+        "title": title,
+        "message": message,
+        **related,
+        "link": link,
+        "is_read": False,
+        "priority": priority,
+        "created_at": datetime.now(timezone.utc).isoformat()
+    }
+
+async def notify(db, notifications: Iterable[dict]) -> int:
+    """Store notifications and push them to connected recipients"""
+    notifications = list(notifications)
+    if not notifications:
+        return 0
+    await db.notifications.insert_many(notifications, ordered=False)
+    for notification in notifications:
+        notification.pop("_id", None)
+        try:
+            await broker.publish(notification["recipient"], notification)
+        except Exception as e:
+            # Clients catch up through replay when they reconnect
+            logger.error(f"Failed to publish notification {notification['id']}: {e}")
+    return len(notifications)
+
+# ----- inbox -----
+
+async def read_state(db, user_id: str) -> dict:
+    state = await db.notification_reads.find_one({"user_id": user_id}, {"_id": 0, "read_before": 1, "read_ids": 1})
+    return {
+        "read_before": (state or {}).get("read_before"),
+        "read_ids": set((state or {}).get("read_ids") or [])
+    }
+
+def _shared_unread_query(user: dict, state: dict) -> dict:
+    query = {"recipient": {"$in": audiences_for(user)}}
+    if state["read_before"]:
+        query["created_at"] = {"$gt": state["read_before"]}
+    if state["read_ids"]:
+        query["id"] = {"$nin": list(state["read_ids"])}
+    return query
+
+def inbox_query(user: dict, state: dict, unread_only: bool = False) -> dict:
+    if not unread_only:
+        return {"recipient": {"$in": [user["id"], *audiences_for(user)]}}
+    return {"$or": [{"recipient": user["id"], "is_read": False}, _shared_unread_query(user, state)]}
+
+def apply_read_state(notification: dict, user: dict, state: dict) -> dict:
+    """Fill in is_read for a shared notification from the user's read state"""
+    if notification["recipient"] == user["id"]:
+        return notification
+    read_before = state["read_before"]
+    notification["is_read"] = notification["id"] in state["read_ids"] or bool(
+        read_before and notification["created_at"] <= read_before
+    )
+    notification["read_at"] = None
+    return notification
+
+async def mark_read(db, user: dict, notification_id: str) -> bool:
+    """Mark one inbox notification read; False if it is not in the user's inbox"""
+    now = datetime.now(timezone.utc).isoformat()
+    result = await db.notifications.update_one(
+        {"id": notification_id, "recipient": user["id"]},
+        {"$set": {"is_read": True, "read_at": now}}
+    )
+    if result.matched_count:
+        return True
+    shared = await db.notifications.find_one(
+        {"id": notification_id, "recipient": {"$in": audiences_for(user)}}, {"_id": 0, "id": 1}
+    )
+    if not shared:
+        return False
+    await db.notification_reads.update_one(
+        {"user_id": user["id"]},
+        {"$addToSet": {"read_ids": notification_id}},
+        upsert=True
+    )
+    await _advance_watermark(db, user)
+    return True
+
+async def _advance_watermark(db, user: dict):
+    """Move read_before up to the oldest unread shared notification, dropping covered read_ids"""
+    state = await read_state(db, user["id"])
+    if not state["read_ids"]:
+        return
+    oldest_unread = await db.notifications.find(
+        _shared_unread_query(user, state), {"_id": 0, "created_at": 1}
+    ).sort([("created_at", 1), ("id", 1)]).limit(1).to_list(1)
+    read = await db.notifications.find(
+        {"id": {"$in": list(state["read_ids"])}}, {"_id": 0, "id": 1, "created_at": 1}
+    ).to_list(None)
+    # Anything created at the same time as the oldest unread one stays an id,
+    # as the watermark is inclusive
+    covered = [
+        item for item in read
+        if not oldest_unread or item["created_at"] < oldest_unread[0]["created_at"]
+    ]
+    watermark = max((item["created_at"] for item in covered), default=state["read_before"])
+    # Ids of notifications that no longer exist are dropped as well
+    covered_ids = set(state["read_ids"]) - {
+        item["id"] for item in read if not watermark or item["created_at"] > watermark
+    }
+    if not covered_ids:
+        return
+    # $max and $pullAll leave concurrent reads of other notifications intact
+    update = {"$pullAll": {"read_ids": list(covered_ids)}}
+    if watermark:
+        update["$max"] = {"read_before": watermark}
+    await db.notification_reads.update_one({"user_id": user["id"]}, update)
+
+async def mark_all_read(db, user: dict) -> int:
+    """Mark the whole inbox read; returns the number of direct notifications updated"""
+    now = datetime.now(timezone.utc).isoformat()
+    result = await db.notifications.update_many(
+        {"recipient": user["id"], "is_read": False},
+        {"$set": {"is_read": True, "read_at": now}}
+    )
+    # Moving the watermark makes the individually read ids redundant
+    await db.notification_reads.update_one(
+        {"user_id": user["id"]},
+        {"$set": {"read_before": now, "read_ids": []}},
+        upsert=True
+    )
+    return result.modified_count
+
+# ----- push -----
+
+def _sse_event(notification: dict) -> str:
+    data = NotificationResponse(**notification).model_dump_json()
+    return f"id: {encode_cursor(notification, 'created_at', 'next')}\nevent: notification\ndata: {data}\n\n"
+
+async def inbox_stream(
+    db,
+    user: dict,
+    last_event_id: Optional[str],
+    is_disconnected: Callable[[], Awaitable[bool]]
+) -> AsyncIterator[str]:
+    """Server-sent events for the user's inbox.
+
+    Subscribes before replaying, so nothing published during the replay is
+    lost, and skips live events that were already replayed. A comment line is
+    sent after `NOTIFICATION_HEARTBEAT_SECONDS` without events to keep proxies
+    from closing the connection and to notice clients that went away.
+    """
+    subscription = broker.subscribe([user["id"], *audiences_for(user)])
+    try:
+        yield f"retry: {STREAM_RETRY_MS}\n\n"
+        replayed = set()
+        if last_event_id:
+            state = await read_state(db, user["id"])
+            query = inbox_query(user, state)
+            cursor = last_event_id
+            while cursor and len(replayed) < STREAM_REPLAY_LIMIT:
+                page, cursor, _ = await paginate(
+                    db.notifications, query, cursor, min(100, STREAM_REPLAY_LIMIT - len(replayed)),
+                    newest_first=False
+                )
+                for notification in page:
+                    replayed.add(notification["id"])
+                    yield _sse_event(apply_read_state(notification, user, state))
+
+        while True:
+            try:
+                notification = await subscription.get(timeout=STREAM_HEARTBEAT_SECONDS)
+            except EOFError:
+                # Closed by shutdown or for falling behind; the client reconnects
+                break
+            if notification is None:
+                if await is_disconnected():
+                    break
+                yield ": heartbeat\n\n"
+            elif notification["id"] not in replayed:
+                yield _sse_event(notification)
+    finally:
+        broker.unsubscribe(subscription)
@@ -0,0 +1,244 @@
+import asyncio
+import hashlib
+import logging
+import os
+import random
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+from models.issue import OPEN_STATUSES
+
+logger = logging.getLogger(__name__)
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "been", "but", "by", "for", "from",
+    "has", "have", "in", "is", "it", "its", "my", "no", "not", "of", "on", "or",
+    "our", "please", "so", "the", "there", "this", "to", "very", "was", "we",
+    "with", "i", "me", "room", "since", "also"
+}
+
+Partition = Tuple[str, str, str]
+
+def _value(field) -> str:
+    # Issue documents built in-process still hold enum members
+    return str(getattr(field, "value", field) or "")
+
+def shingles(text: str) -> Set[str]:
+    """Word unigrams and bigrams of `text`, lower-cased, without stopwords"""
+    words = [w for w in _TOKEN_RE.findall(text.lower()) if w not in _STOPWORDS]
+    result = set(words)
+    result.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    return result
+
+class SimilarityIndex:
+    """In-memory MinHash/LSH index for spotting near-duplicate open issues.
+
+    Issues are partitioned by (hostel, block, category) and each one keeps a
+    MinHash signature of its title and description shingles. Signatures are
+    split into `SIMILARITY_BANDS` bands; issues sharing any band bucket are
+    candidates and are ranked by estimated Jaccard similarity, so a lookup
+    never touches the issues collection.
+
+    The index is loaded from Mongo on startup, updated as issues are created,
+    updated or merged in this process, and topped up every
+    `SIMILARITY_REFRESH_SECONDS` with issues created by other processes.
+    Resolutions and closures made by other processes only reach this index
+    on restart, so a suggestion can occasionally point at an issue that was
+    just resolved.
+    """
+
+    def __init__(self):
+        self.num_perm = int(os.environ.get('SIMILARITY_NUM_PERM', 64))
+        self.bands = int(os.environ.get('SIMILARITY_BANDS', 32))
+        self.rows = max(self.num_perm // self.bands, 1)
+        self.threshold = float(os.environ.get('SIMILARITY_THRESHOLD', 0.3))
+        self.refresh_interval_seconds = float(os.environ.get('SIMILARITY_REFRESH_SECONDS', 60))
+        rng = random.Random(1)
+        self._perms = [
+            (rng.randint(1, _MERSENNE_PRIME - 1), rng.randint(0, _MERSENNE_PRIME - 1))
+            for _ in range(self.num_perm)
+        ]
+        self._entries: Dict[str, dict] = {}
+        self._buckets: Dict[Partition, List[Dict[int, Set[str]]]] = {}
+        self._synced_until: Optional[str] = None
+        self._db = None
+        self._task: Optional[asyncio.Task] = None
+        self.metrics = {"queries": 0, "candidates_scored": 0, "loaded": 0}
+
+    # ----- signatures -----
+
+    def signature(self, title: str, description: str) -> Tuple[int, ...]:
+        hashes = [
+            int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "little") & _MAX_HASH
+            for s in shingles(f"{title} {description}")
+        ]
+        if not hashes:
+            return tuple([_MAX_HASH] * self.num_perm)
+        return tuple(
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in self._perms
+        )
+
+    def _band_keys(self, signature: Tuple[int, ...]) -> List[int]:
+        return [
+            hash(signature[band * self.rows:(band + 1) * self.rows])
+            for band in range(self.bands)
+        ]
+
+    @staticmethod
+    def partition_of(issue: dict) -> Partition:
+        location = issue.get("location") or {}
+        return (location.get("hostel") or "", location.get("block") or "", _value(issue.get("category")))
+
+    # ----- maintenance -----
+
+    def add(self, issue: dict):
+        """Index `issue`, replacing its previous entry; dropped once no longer open"""
+        self.remove(issue["id"])
+        if issue.get("is_duplicate") or _value(issue.get("status")) not in OPEN_STATUSES:
+            return
+        signature = self.signature(issue.get("title", ""), issue.get("description", ""))
+        partition = self.partition_of(issue)
+        band_keys = self._band_keys(signature)
+        self._entries[issue["id"]] = {
+            "id": issue["id"],
+            "ticket_id": issue.get("ticket_id"),
+            "title": issue.get("title"),
+            "status": _value(issue.get("status")),
+            "visibility": _value(issue.get("visibility")),
+            "reporter_id": issue.get("reporter_id"),
+            "partition": partition,
+            "signature": signature,
+            "band_keys": band_keys
+        }
+        buckets = self._buckets.setdefault(partition, [defaultdict(set) for _ in range(self.bands)])
+        for band, key in enumerate(band_keys):
+            buckets[band][key].add(issue["id"])
+
+    def remove(self, issue_id: str):
+        entry = self._entries.pop(issue_id, None)
+        if entry is None:
+            return
+        buckets = self._buckets.get(entry["partition"])
+        for band, key in enumerate(entry["band_keys"]):
+            members = buckets[band].get(key)
+            if members is not None:
+                members.discard(issue_id)
+                if not members:
+                    del buckets[band][key]
+
+    # ----- queries -----
+
+    def get(self, issue_id: str) -> Optional[dict]:
+        """Indexed issue as a lookup key for find_similar, or None"""
+        entry = self._entries.get(issue_id)
+        if entry is None:
+            return None
+        hostel, block, category = entry["partition"]
+        return {"id": issue_id, "category": category, "location": {"hostel": hostel, "block": block}}
+
+    def find_similar(
+        self,
+        issue: dict,
+        limit: int = 5,
+        viewer: Optional[dict] = None,
+        exclude_id: Optional[str] = None
+    ) -> List[dict]:
+        """Open issues in the same partition similar to `issue`, best match first.
+
+        Students (`viewer`) only see public issues and their own.
+        """
+        self.metrics["queries"] += 1
+        entry = self._entries.get(issue.get("id")) if issue.get("id") else None
+        if entry is not None:
+            signature, band_keys = entry["signature"], entry["band_keys"]
+        else:
+            signature = self.signature(issue.get("title", ""), issue.get("description", ""))
+            band_keys = self._band_keys(signature)
+
+        buckets = self._buckets.get(self.partition_of(issue))
+        if not buckets:
+            return []
+
+        candidates = set()
+        for band, key in enumerate(band_keys):
+            candidates.update(buckets[band].get(key, ()))
+        candidates.discard(exclude_id)
+
+        restrict_to = viewer["id"] if viewer and viewer.get("role") == "student" else None
+        results = []
+        for candidate_id in candidates:
+            candidate = self._entries[candidate_id]
+            if restrict_to and candidate["visibility"] != "Public" and candidate["reporter_id"] != restrict_to:
+                continue
+            self.metrics["candidates_scored"] += 1
+            matches = sum(1 for x, y in zip(signature, candidate["signature"]) if x == y)
+            score = matches / self.num_perm
+            if score >= self.threshold:
+                results.append({
+                    "id": candidate["id"],
+                    "ticket_id": candidate["ticket_id"],
+                    "title": candidate["title"],
+                    "status": candidate["status"],
+                    "similarity": round(score, 3)
+                })
+
+        results.sort(key=lambda r: r["similarity"], reverse=True)
+        return results[:limit]
+
+    # ----- loading -----
+
+    _PROJECTION = {
+        "_id": 0, "id": 1, "ticket_id": 1, "title": 1, "description": 1, "category": 1,
+        "status": 1, "visibility": 1, "reporter_id": 1, "location": 1, "is_duplicate": 1,
+        "created_at": 1
+    }
+
+    async def _load_since(self, since: Optional[str]) -> int:
+        query = {"status": {"$in": OPEN_STATUSES}, "is_duplicate": {"$ne": True}}
+        if since:
+            query["created_at"] = {"$gt": since}
+        loaded = 0
+        async for issue in self._db.issues.find(query, self._PROJECTION):
+            self.add(issue)
+            loaded += 1
+            if not self._synced_until or issue["created_at"] > self._synced_until:
+                self._synced_until = issue["created_at"]
+        self.metrics["loaded"] += loaded
+        return loaded
+
+    async def start(self, db):
+        if self._task is not None:
+            return
+        self._db = db
+        self._task = asyncio.create_task(self._refresher())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def _refresher(self):
+        while True:
+            try:
+                await self._load_since(self._synced_until)
+            except Exception as e:
+                logger.error(f"Similarity index refresh failed: {e}")
+            await asyncio.sleep(self.refresh_interval_seconds)
+
+    def stats(self) -> dict:
+        return {
+            "indexed_issues": len(self._entries),
+            "partitions": len(self._buckets),
+            "num_perm": self.num_perm,
+            "bands": self.bands,
+            "threshold": self.threshold,
+            **self.metrics
+        }
+
+similarity_index = SimilarityIndex()
@@ -0,0 +1,67 @@
+import asyncio
+import os
+from typing import Optional
+from zoneinfo import ZoneInfo
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from utils.ticket_generator import ticket_day, format_ticket_id
+
+class TicketSequence:
+    """Hands out per-day ticket IDs (HST-YYMMDD-NNNN) from a Mongo counter.
+
+    Each process reserves a block of `TICKET_BLOCK_SIZE` numbers with a single
+    atomic $inc on the `counters` collection and serves IDs from memory until
+    the block runs out, so worker processes never collide and most tickets
+    cost no extra round trip. IDs are monotonic per process but not gap-free:
+    numbers left in a block when the process stops or the day changes are
+    never used. The day boundary follows `TICKET_TIMEZONE` (default UTC).
+    """
+
+    def __init__(self):
+        self.block_size = int(os.environ.get('TICKET_BLOCK_SIZE', 20))
+        self.tz = ZoneInfo(os.environ.get('TICKET_TIMEZONE', 'UTC'))
+        self._lock = asyncio.Lock()
+        self._day: Optional[str] = None
+        self._next = 0
+        self._end = 0
+        self.metrics = {"issued": 0, "blocks_reserved": 0}
+
+    async def next_id(self, db) -> str:
+        async with self._lock:
+            day = ticket_day(tz=self.tz)
+            if day != self._day or self._next > self._end:
+                await self._reserve_block(db, day)
+            sequence = self._next
+            self._next += 1
+            self.metrics["issued"] += 1
+            return format_ticket_id(day, sequence)
+
+    async def _reserve_block(self, db, day: str):
+        counter_id = f"ticket:{day}"
+        try:
+            counter = await self._increment(db, counter_id)
+        except DuplicateKeyError:
+            # Another process created today's counter at the same moment
+            counter = await self._increment(db, counter_id)
+        self._day = day
+        self._end = counter["value"]
+        self._next = self._end - self.block_size + 1
+        self.metrics["blocks_reserved"] += 1
+
+    async def _increment(self, db, counter_id: str) -> dict:
+        return await db.counters.find_one_and_update(
+            {"id": counter_id},
+            {"$inc": {"value": self.block_size}},
+            projection={"_id": 0, "value": 1},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+
+    def stats(self) -> dict:
+        return {
+            "block_size": self.block_size,
+            "remaining_in_block": max(self._end - self._next + 1, 0),
+            **self.metrics
+        }
+
+ticket_sequence = TicketSequence()
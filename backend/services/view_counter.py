@@ -0,0 +1,109 @@
+import asyncio
+import logging
+import os
+from collections import Counter
+from typing import Optional
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+class ViewCounter:
+    """Write-behind counter for issue views.
+
+    Views are accumulated in memory and written every `VIEW_FLUSH_SECONDS` as
+    one unordered bulk_write of $inc operations, so reading an issue costs a
+    single query. A flush is triggered early once `VIEW_FLUSH_MAX_PENDING`
+    issues have pending views, and a final flush runs on shutdown.
+
+    Loss is bounded: a crash loses at most one flush interval of views, and
+    if a flush fails its counts are merged back for the next attempt unless
+    that would exceed `VIEW_MAX_PENDING` issues, in which case they are
+    dropped (and counted) rather than growing memory without limit.
+    """
+
+    def __init__(self):
+        self.flush_interval_seconds = float(os.environ.get('VIEW_FLUSH_SECONDS', 5))
+        self.flush_threshold = int(os.environ.get('VIEW_FLUSH_MAX_PENDING', 1000))
+        self.max_pending = int(os.environ.get('VIEW_MAX_PENDING', 50000))
+        self._pending: Counter = Counter()
+        self._db = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
+        self._wakeup: Optional[asyncio.Event] = None
+        self.metrics = {
+            "recorded": 0,
+            "flushed": 0,
+            "flushes": 0,
+            "flush_errors": 0,
+            "dropped": 0
+        }
+
+    def record(self, issue_id: str):
+        self._pending[issue_id] += 1
+        self.metrics["recorded"] += 1
+        if self._wakeup is not None and len(self._pending) >= self.flush_threshold:
+            self._wakeup.set()
+
+    def pending_for(self, issue_id: str) -> int:
+        return self._pending.get(issue_id, 0)
+
+    async def start(self, db):
+        if self._task is not None:
+            return
+        self._db = db
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._flusher())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            self._wakeup = None
+        await self.flush()
+
+    async def _flusher(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        async with self._flush_lock:
+            if not self._pending or self._db is None:
+                return 0
+            batch, self._pending = self._pending, Counter()
+            try:
+                await self._db.issues.bulk_write(
+                    [UpdateOne({"id": issue_id}, {"$inc": {"views": count}}) for issue_id, count in batch.items()],
+                    ordered=False
+                )
+            except Exception as e:
+                self.metrics["flush_errors"] += 1
+                logger.error(f"View counter flush failed: {e}")
+                self._requeue(batch)
+                return 0
+
+            total = sum(batch.values())
+            self.metrics["flushes"] += 1
+            self.metrics["flushed"] += total
+            return total
+
+    def _requeue(self, batch: Counter):
+        for issue_id, count in batch.items():
+            if issue_id in self._pending or len(self._pending) < self.max_pending:
+                self._pending[issue_id] += count
+            else:
+                self.metrics["dropped"] += count
+
+    def stats(self) -> dict:
+        return {
+            "pending_issues": len(self._pending),
+            "pending_increments": sum(self._pending.values()),
+            **self.metrics
+        }
+
+view_counter = ViewCounter()
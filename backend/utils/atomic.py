@@ -0,0 +1,107 @@
+from typing import Dict, Optional
+from pymongo import ReturnDocument
+
+# Toggles decide and write in a single find_one_and_update so concurrent
+# requests cannot lose each other's changes, and the denormalized count is
+# recomputed from membership in the same write so it never drifts.
+
+def _check_key(key: str):
+    # Members are used as field names in keyed choices
+    if not key or "." in key or key.startswith("$"):
+        raise ValueError(f"Invalid member key: {key!r}")
+
+def is_member(array_field: str, member: str) -> dict:
+    """Projection/aggregation expression: is `member` in `array_field`"""
+    return {"$in": [member, {"$ifNull": [f"${array_field}", []]}]}
+
+async def toggle_membership(
+    collection,
+    filters: dict,
+    array_field: str,
+    count_field: str,
+    member: str
+) -> Optional[dict]:
+    """Add `member` to `array_field` if absent, otherwise remove it.
+
+    Returns {count_field: <new count>, "is_member": <new state>}, or None when
+    no document matches `filters`.
+    """
+    members = {"$ifNull": [f"${array_field}", []]}
+    doc = await collection.find_one_and_update(
+        filters,
+        [
+            {"$set": {array_field: {"$cond": [
+                {"$in": [member, members]},
+                {"$setDifference": [members, [member]]},
+                {"$concatArrays": [members, [member]]}
+            ]}}},
+            {"$set": {count_field: {"$size": f"${array_field}"}}}
+        ],
+        projection={"_id": 0, count_field: 1, "is_member": is_member(array_field, member)},
+        return_document=ReturnDocument.AFTER
+    )
+    if doc is None:
+        return None
+    return {count_field: doc[count_field], "is_member": doc["is_member"]}
+
+async def toggle_keyed_choice(
+    collection,
+    filters: dict,
+    choices_field: str,
+    member: str,
+    choice: str,
+    count_fields: Dict[str, str],
+    projection: Optional[dict] = None
+) -> Optional[dict]:
+    """Record `member`'s `choice` in the `choices_field` map, keeping per-choice counters.
+
+    Choosing the current choice again removes it; choosing a different one
+    moves the member's vote. `count_fields` maps each choice to its counter
+    field. Returns the updated document, or None when nothing matches.
+    """
+    _check_key(member)
+    if choice not in count_fields:
+        raise ValueError(f"Unknown choice: {choice!r}")
+
+    previous = {"$ifNull": [f"${choices_field}.{member}", None]}
+    counters = {}
+    for option, field in count_fields.items():
+        delta = [{"$cond": [{"$eq": [previous, option]}, -1, 0]}]
+        if option == choice:
+            delta.append({"$cond": [{"$eq": [previous, option]}, 0, 1]})
+        counters[field] = {"$add": [{"$ifNull": [f"${field}", 0]}, *delta]}
+
+    return await collection.find_one_and_update(
+        filters,
+        [{"$set": {
+            **counters,
+            f"{choices_field}.{member}": {"$cond": [
+                {"$eq": [previous, choice]}, "$$REMOVE", {"$literal": choice}
+            ]}
+        }}],
+        projection=projection or {"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
+
+async def record_single_choice(
+    collection,
+    filters: dict,
+    choices_field: str,
+    member: str,
+    choice: str,
+    update: dict,
+    projection: Optional[dict] = None
+) -> Optional[dict]:
+    """Record `member`'s one-time `choice` together with `update`, unless they already chose.
+
+    Returns the updated document, or None when nothing matches `filters` or
+    the member has already made a choice.
+    """
+    _check_key(member)
+    key = f"{choices_field}.{member}"
+    return await collection.find_one_and_update(
+        {**filters, key: {"$exists": False}},
+        {**update, "$set": {**update.get("$set", {}), key: choice}},
+        projection=projection or {"_id": 0},
+        return_document=ReturnDocument.AFTER
+    )
@@ -0,0 +1,64 @@
+import time
+
+class CircuitBreaker:
+    """Fails fast after repeated upstream failures.
+
+    closed    -> calls pass through; `failure_threshold` consecutive failures open the breaker
+    open      -> calls are rejected until `reset_timeout_seconds` have elapsed
+    half_open -> a single trial call is let through; success closes, failure re-opens
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout_seconds: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout_seconds = reset_timeout_seconds
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected_calls = 0
+        self._trial_in_flight = False
+
+    def allow_request(self) -> bool:
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.reset_timeout_seconds:
+                self.rejected_calls += 1
+                return False
+            self.state = self.HALF_OPEN
+
+        if self.state == self.HALF_OPEN:
+            if self._trial_in_flight:
+                self.rejected_calls += 1
+                return False
+            self._trial_in_flight = True
+
+        return True
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        self._trial_in_flight = False
+        self.state = self.CLOSED
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        self._trial_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """Give back an allowed call that ended without an outcome (e.g. it was cancelled)"""
+        self._trial_in_flight = False
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected_calls": self.rejected_calls
+        }
@@ -0,0 +1,89 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, Dict, List
+
+# Exported issue columns, in order; nested fields are flattened with their
+# last path segment as the column name
+ISSUE_EXPORT_FIELDS: Dict[str, str] = {
+    "id": "id",
+    "ticket_id": "ticket_id",
+    "title": "title",
+    "description": "description",
+    "category": "category",
+    "priority": "priority",
+    "status": "status",
+    "visibility": "visibility",
+    "hostel": "location.hostel",
+    "block": "location.block",
+    "room": "location.room",
+    "reporter_name": "reporter_name",
+    "assigned_to_name": "assigned_to_name",
+    "upvote_count": "upvote_count",
+    "comment_count": "comment_count",
+    "views": "views",
+    "reported_at": "reported_at",
+    "first_response_at": "first_response_at",
+    "resolved_at": "resolved_at",
+    "closed_at": "closed_at",
+    "escalated_at": "escalated_at",
+    "response_time_hours": "response_time_hours",
+    "resolution_time_hours": "resolution_time_hours",
+    "is_duplicate": "is_duplicate",
+    "merged_with": "merged_with"
+}
+
+EXPORT_MEDIA_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+# Spreadsheet apps evaluate cells starting with these as formulas
+_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+def export_projection(fields: Dict[str, str]) -> dict:
+    return {"_id": 0, **{path: 1 for path in fields.values()}}
+
+def _lookup(doc: dict, path: str):
+    for part in path.split("."):
+        if not isinstance(doc, dict):
+            return None
+        doc = doc.get(part)
+    return doc
+
+def flatten(doc: dict, fields: Dict[str, str]) -> dict:
+    return {column: _lookup(doc, path) for column, path in fields.items()}
+
+def _csv_cell(value):
+    if value is None:
+        return ""
+    if isinstance(value, str) and value.startswith(_FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+async def stream_export(cursor, fields: Dict[str, str], fmt: str, chunk_rows: int) -> AsyncIterator[str]:
+    """Encode documents from `cursor` as CSV or NDJSON, `chunk_rows` rows per chunk.
+
+    Only one chunk is held in memory at a time, and the cursor is closed if
+    the client disconnects before the end.
+    """
+    columns: List[str] = list(fields)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if fmt == "csv":
+        writer.writerow(columns)
+    rows = 0
+    try:
+        async for doc in cursor:
+            row = flatten(doc, fields)
+            if fmt == "csv":
+                writer.writerow([_csv_cell(row[column]) for column in columns])
+            else:
+                buffer.write(json.dumps(row, default=str))
+                buffer.write("\n")
+            rows += 1
+            if rows % chunk_rows == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+    finally:
+        await cursor.close()
@@ -0,0 +1,91 @@
+import base64
+import json
+from datetime import datetime
+from typing import List, Optional, Tuple
+from fastapi import HTTPException, Response
+from pymongo import ASCENDING, DESCENDING
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+PREV_CURSOR_HEADER = "X-Prev-Cursor"
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+def _decode_value(value):
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+def encode_cursor(doc: dict, sort_field: str, direction: str) -> str:
+    raw = json.dumps(
+        {"k": _encode_value(doc[sort_field]), "id": doc["id"], "d": direction},
+        separators=(",", ":")
+    )
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return {"k": _decode_value(data["k"]), "id": data["id"], "d": data.get("d", "next")}
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+async def paginate(
+    collection,
+    query: dict,
+    cursor: Optional[str] = None,
+    limit: int = 20,
+    sort_field: str = "created_at",
+    projection: Optional[dict] = None,
+    newest_first: bool = True
+) -> Tuple[List[dict], Optional[str], Optional[str]]:
+    """Keyset pagination over (sort_field, id), newest first by default.
+
+    Unlike skip/limit the cost of a page does not grow with its depth, and
+    concurrent inserts cannot shift items between pages. Needs an index
+    ending in (sort_field, id) after any equality filters.
+
+    Returns (items, next_cursor, prev_cursor); a cursor is None when there
+    is nothing further in that direction.
+    """
+    filters = query
+    backwards = False
+    if cursor:
+        position = decode_cursor(cursor)
+        backwards = position["d"] == "prev"
+        op = "$lt" if newest_first != backwards else "$gt"
+        keyset = {"$or": [
+            {sort_field: {op: position["k"]}},
+            {sort_field: position["k"], "id": {op: position["id"]}}
+        ]}
+        filters = {"$and": [query, keyset]} if query else keyset
+
+    order = DESCENDING if newest_first != backwards else ASCENDING
+    docs = await collection.find(filters, projection or {"_id": 0}).sort(
+        [(sort_field, order), ("id", order)]
+    ).limit(limit + 1).to_list(limit + 1)
+
+    has_more = len(docs) > limit
+    docs = docs[:limit]
+    if backwards:
+        docs.reverse()
+
+    if not docs:
+        return docs, None, None
+
+    if backwards:
+        next_cursor = encode_cursor(docs[-1], sort_field, "next")
+        prev_cursor = encode_cursor(docs[0], sort_field, "prev") if has_more else None
+    else:
+        next_cursor = encode_cursor(docs[-1], sort_field, "next") if has_more else None
+        prev_cursor = encode_cursor(docs[0], sort_field, "prev") if cursor else None
+    return docs, next_cursor, prev_cursor
+
+def set_cursor_headers(response: Response, next_cursor: Optional[str], prev_cursor: Optional[str]):
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    if prev_cursor:
+        response.headers[PREV_CURSOR_HEADER] = prev_cursor
@@ -0,0 +1,59 @@
+import asyncio
+import os
+import threading
+import bcrypt
+from concurrent.futures import ThreadPoolExecutor
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# bcrypt releases the GIL while hashing, so a small thread pool keeps the
+# event loop free during login storms without the overhead of processes.
+PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS', min(4, os.cpu_count() or 1)))
+
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+
+_stats_lock = threading.Lock()
+_stats = {
+    "queued": 0,
+    "running": 0,
+    "completed": 0
+}
+
+def _run_tracked(func, *args):
+    with _stats_lock:
+        _stats["queued"] -= 1
+        _stats["running"] += 1
+    try:
+        return func(*args)
+    finally:
+        with _stats_lock:
+            _stats["running"] -= 1
+            _stats["completed"] += 1
+
+async def _submit(func, *args):
+    with _stats_lock:
+        _stats["queued"] += 1
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, _run_tracked, func, *args)
+
+def _hash(password: str) -> str:
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+
+def _verify(password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+
+async def hash_password(password: str) -> str:
+    return await _submit(_hash, password)
+
+async def verify_password(password: str, hashed_password: str) -> bool:
+    return await _submit(_verify, password, hashed_password)
+
+def password_pool_stats() -> dict:
+    with _stats_lock:
+        return {
+            "workers": PASSWORD_HASH_WORKERS,
+            "queue_depth": _stats["queued"],
+            "running": _stats["running"],
+            "completed": _stats["completed"]
+        }
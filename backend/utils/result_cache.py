@@ -0,0 +1,53 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable
+from utils.ttl_cache import TTLCache, _MISSING
+
+class ResultCache:
+    """TTL cache for computed results with single-flight misses.
+
+    Concurrent misses for the same key share one computation instead of each
+    running it. `invalidate_all` drops every entry and bumps a generation so a
+    computation that was already running when the data changed is returned to
+    the callers already waiting on it but not cached; callers arriving after
+    the invalidation start a fresh computation.
+    """
+
+    def __init__(self, max_size: int = 256, ttl_seconds: float = 30.0):
+        self._cache = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds)
+        self._in_flight: Dict[Hashable, asyncio.Future] = {}
+        self._generation = 0
+        self.coalesced = 0
+
+    async def get_or_compute(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        value = self._cache.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        task = self._in_flight.get(key)
+        if task is None:
+            # Runs as its own task so a caller disconnecting does not cancel
+            # the computation for everyone else waiting on it
+            task = asyncio.ensure_future(compute())
+            self._in_flight[key] = task
+            generation = self._generation
+            task.add_done_callback(lambda done: self._finish(key, done, generation))
+        else:
+            self.coalesced += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable, task: asyncio.Future, generation: int):
+        # A computation started after an invalidation may own the key by now
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if task.cancelled() or task.exception() is not None:
+            return
+        if generation == self._generation:
+            self._cache.set(key, task.result())
+
+    def invalidate_all(self):
+        self._generation += 1
+        self._cache.clear()
+        self._in_flight.clear()
+
+    def stats(self) -> dict:
+        return {**self._cache.stats(), "coalesced": self.coalesced, "in_flight": len(self._in_flight)}
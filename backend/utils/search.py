@@ -0,0 +1,27 @@
+import re
+from typing import Optional
+
+TICKET_ID_PATTERN = re.compile(r"^HST-[0-9-]*$", re.IGNORECASE)
+
+def ticket_id_prefix_filter(query: str) -> Optional[dict]:
+    """Anchored, escaped prefix match on ticket_id, or None if `query` is not a ticket ID.
+
+    An anchored case-sensitive prefix regex can walk the ticket_id index.
+    """
+    query = query.strip()
+    if not TICKET_ID_PATTERN.match(query):
+        return None
+    return {"ticket_id": {"$regex": "^" + re.escape(query.upper())}}
+
+def text_search_terms(query: str) -> str:
+    """Turn free text into plain $text search terms.
+
+    Quotes and leading '-' have special meaning to $text (phrase and
+    negation), so they are stripped to treat user input as plain words.
+    """
+    words = []
+    for word in query.replace('"', " ").split():
+        word = word.lstrip("-")
+        if word:
+            words.append(word)
+    return " ".join(words)
@@ -1,7 +1,11 @@
-from datetime import datetime
+from datetime import datetime, timezone
+from typing import Optional
+from zoneinfo import ZoneInfo
 
-def generate_ticket_id() -> str:
-    now = datetime.utcnow()
-    date_str = now.strftime("%y%m%d")
-    time_str = now.strftime("%H%M%S")
-    return f"HST-{date_str}-{time_str}"
+def ticket_day(now: Optional[datetime] = None, tz: Optional[ZoneInfo] = None) -> str:
+    """YYMMDD of `now` (default: current time) in `tz` (default: UTC)"""
+    now = now or datetime.now(timezone.utc)
+    return now.astimezone(tz or timezone.utc).strftime("%y%m%d")
+
+def format_ticket_id(day: str, sequence: int) -> str:
+    return f"HST-{day}-{sequence:04d}"
@@ -0,0 +1,27 @@
+import time
+from contextlib import contextmanager
+from typing import List, Tuple
+from fastapi import Response
+
+SERVER_TIMING_HEADER = "Server-Timing"
+
+class ServerTiming:
+    """Collects named phase durations for the Server-Timing response header"""
+
+    def __init__(self):
+        self._started = time.perf_counter()
+        self.phases: List[Tuple[str, float]] = []
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases.append((name, (time.perf_counter() - started) * 1000))
+
+    def apply(self, response: Response):
+        total = (time.perf_counter() - self._started) * 1000
+        entries = [f"{name};dur={ms:.1f}" for name, ms in self.phases]
+        entries.append(f"total;dur={total:.1f}")
+        response.headers[SERVER_TIMING_HEADER] = ", ".join(entries)
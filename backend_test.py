@@ -438,7 +438,7 @@ class HostelAPITester:
             print("✅ Issue detail retrieved successfully")
             print(f"   Title: {issue.get('title')}")
             print(f"   Views: {issue.get('views')}")
-            print(f"   Comments count: {len(issue.get('comments', []))}")
+            print(f"   Comments count: {issue.get('comment_count', 0)}")
             print(f"   Status history entries: {len(issue.get('status_history', []))}")
             
             # Check if views incremented
@@ -18,6 +18,7 @@ const IssueDetailPage = () => {
   const { user } = useAuth();
   const { isDark, toggleTheme } = useTheme();
   const [issue, setIssue] = useState(null);
+  const [comments, setComments] = useState([]);
   const [loading, setLoading] = useState(true);
   const [comment, setComment] = useState('');
   const [submittingComment, setSubmittingComment] = useState(false);
@@ -48,9 +49,37 @@ const IssueDetailPage = () => {
     }
   }, [issueId, navigate, user?.id]);
 
+  const fetchComments = React.useCallback(async () => {
+    try {
+      const token = localStorage.getItem('token');
+      // Comments come in pages of up to 100; follow the cursor for the whole thread
+      const allComments = [];
+      let cursor = null;
+      do {
+        const params = new URLSearchParams({ limit: 100 });
+        if (cursor) params.set('cursor', cursor);
+        const response = await fetch(`${process.env.REACT_APP_BACKEND_URL}/api/issues/${issueId}/comments?${params}`, {
+          headers: {
+            'Authorization': `Bearer ${token}`
+          }
+        });
+
+        if (!response.ok) throw new Error('Failed to fetch comments');
+
+        allComments.push(...(await response.json()));
+        cursor = response.headers.get('X-Next-Cursor');
+      } while (cursor);
+
+      setComments(allComments);
+    } catch (error) {
+      toast.error('Failed to load comments');
+    }
+  }, [issueId]);
+
   useEffect(() => {
     fetchIssueDetails();
-  }, [fetchIssueDetails]);
+    fetchComments();
+  }, [fetchIssueDetails, fetchComments]);
 
   const handleAddComment = async (e) => {
     e.preventDefault();
@@ -77,6 +106,7 @@ const IssueDetailPage = () => {
       setComment('');
       setReplyTo(null);
       fetchIssueDetails();
+      fetchComments();
     } catch (error) {
       toast.error('Failed to add comment');
     } finally {
@@ -122,7 +152,7 @@ const IssueDetailPage = () => {
 
       const data = await response.json();
       setHasUpvoted(data.has_upvoted);
-      fetchIssueDetails();
+      setIssue(prev => ({ ...prev, upvote_count: data.upvote_count }));
     } catch (error) {
       toast.error('Failed to upvote issue');
     }
@@ -141,21 +171,19 @@ const IssueDetailPage = () => {
 
       if (!response.ok) throw new Error('Failed to like comment');
 
-      // Refresh to show new like count
-      fetchIssueDetails();
+      const data = await response.json();
+      setComments(prev => prev.map(c => (
+        c.id === commentId ? { ...c, likes_count: data.likes_count, has_liked: data.has_liked } : c
+      )));
     } catch (error) {
       toast.error('Failed to like comment');
     }
   };
 
   const getThreadedComments = () => {
-    if (!issue.comments) return [];
     const commentMap = {};
     const roots = [];
 
-    // Deep copy to avoid mutating state directly
-    const comments = JSON.parse(JSON.stringify(issue.comments));
-
     comments.forEach(c => {
       commentMap[c.id] = { ...c, replies: [] };
     });
@@ -191,13 +219,13 @@ const IssueDetailPage = () => {
             <button 
               onClick={() => handleLikeComment(comment.id)}
               className={`flex items-center gap-1 text-xs px-2 py-1 rounded-full transition-colors ${
-                comment.likes?.includes(user?.id) 
+                comment.has_liked 
                   ? 'bg-indigo-100 text-indigo-700 dark:bg-indigo-900/50 dark:text-indigo-300' 
                   : 'text-slate-500 hover:bg-slate-100 dark:text-slate-400 dark:hover:bg-slate-800'
               }`}
             >
               <ThumbsUp className="w-3 h-3" />
-              <span>{comment.likes?.length || 0}</span>
+              <span>{comment.likes_count || 0}</span>
             </button>
             <button 
               onClick={() => setReplyTo(comment.id)}
@@ -396,13 +424,13 @@ const IssueDetailPage = () => {
               <CardHeader>
                 <CardTitle className="flex items-center gap-2 dark:text-white">
                   <MessageSquare className="w-5 h-5" />
-                  Comments ({issue.comments?.length || 0})
+                  Comments ({issue.comment_count || 0})
                 </CardTitle>
               </CardHeader>
               <CardContent>
                 {/* Existing Comments */}
                 <div className="space-y-4 mb-6">
-                  {issue.comments && issue.comments.length > 0 ? (
+                  {comments.length > 0 ? (
                     getThreadedComments().map((comment) => (
                       <CommentItem key={comment.id} comment={comment} />
                     ))
@@ -502,7 +530,7 @@ const IssueDetailPage = () => {
                       className={hasUpvoted ? "bg-indigo-600 hover:bg-indigo-700" : "dark:text-white dark:border-slate-600 dark:hover:bg-slate-700"}
                     >
                       <ThumbsUp className="w-4 h-4 mr-1" />
-                      {issue.upvotes?.length || 0}
+                      {issue.upvote_count || 0}
                     </Button>
                     <span className="text-xs text-slate-500 dark:text-slate-500">
                       {hasUpvoted ? "You find this helpful" : "Mark as helpful"}
@@ -94,8 +94,8 @@ const ManagementDashboard = () => {
       // Fetch all issues - backend automatically filters based on user role
       // Management users get ALL issues, students get their own + public issues
       const issuesUrl = selectedStatus === 'all' 
-        ? `${process.env.REACT_APP_BACKEND_URL}/api/issues?limit=100`
-        : `${process.env.REACT_APP_BACKEND_URL}/api/issues?status=${selectedStatus}&limit=100`;
+        ? `${process.env.REACT_APP_BACKEND_URL}/api/issues?view=summary&limit=100`
+        : `${process.env.REACT_APP_BACKEND_URL}/api/issues?status=${selectedStatus}&view=summary&limit=100`;
       
       const [issuesResponse, analyticsResponse] = await Promise.all([
         fetch(issuesUrl, {
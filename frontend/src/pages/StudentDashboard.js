@@ -61,7 +61,7 @@ const StudentDashboard = () => {
   const fetchData = async () => {
     try {
       const [issuesData, announcementsData, pollsData] = await Promise.all([
-        getIssues(),
+        getIssues({ view: 'summary' }),
         getAnnouncements(),
         getPolls()
       ]);
@@ -90,9 +90,13 @@ const StudentDashboard = () => {
     e.preventDefault();
     
     try {
-      await createIssue(newIssue);
+      const created = await createIssue(newIssue);
       // Show success message after API call succeeds
       toast.success('Issue submitted successfully!');
+      if (created.possible_duplicates?.length) {
+        const match = created.possible_duplicates[0];
+        toast.info(`Similar issue already reported: ${match.ticket_id} - ${match.title}`, { duration: 6000 });
+      }
       setNewIssue({
         title: '',
         description: '',
@@ -0,0 +1,78 @@
+from datetime import datetime, timezone
+from services.assignment import AssignmentEngine
+
+def at(hour, minute=0):
+    return datetime(2024, 1, 31, hour, minute, tzinfo=timezone.utc)
+
+def make_engine(*staff):
+    engine = AssignmentEngine()
+    engine._index(staff)
+    return engine
+
+def staff(staff_id, expertise, areas=None, shift=None):
+    return {
+        "id": staff_id,
+        "name": staff_id.title(),
+        "expertise": expertise,
+        "assigned_areas": areas or [],
+        "shift_timing": shift
+    }
+
+def issue(category="Plumbing", hostel="Hostel-A", block="Block-1"):
+    return {"category": category, "location": {"hostel": hostel, "block": block}}
+
+def test_on_shift_day_overnight_and_unset():
+    engine = make_engine(
+        staff("day", ["General"], shift={"start": "09:00", "end": "17:00"}),
+        staff("night", ["General"], shift={"start": "22:00", "end": "06:00"}),
+        staff("always", ["General"])
+    )
+    assert engine.on_shift("day", at(9)) and not engine.on_shift("day", at(17))
+    assert engine.on_shift("night", at(23, 30)) and engine.on_shift("night", at(5, 59))
+    assert not engine.on_shift("night", at(6)) and not engine.on_shift("night", at(12))
+    assert engine.on_shift("always", at(3))
+
+def test_choose_prefers_expertise_and_area_then_general():
+    engine = make_engine(
+        staff("plumber-b", ["Plumbing"], [{"hostel": "Hostel-B"}]),
+        staff("plumber-a", ["Plumbing"], [{"hostel": "Hostel-A", "blocks": ["Block-1"]}]),
+        staff("cleaner", ["Cleaning"]),
+        staff("handyman", ["General"])
+    )
+    assert engine.choose(issue())["id"] == "plumber-a"
+    assert engine.choose(issue(block="Block-2"))["id"] == "handyman"
+    assert engine.choose(issue(hostel="Hostel-B", block="Block-9"))["id"] == "plumber-b"
+    assert engine.choose(issue(category="Cleanliness"))["id"] == "cleaner"
+    assert engine.choose(issue(category="Electrical"))["id"] == "handyman"
+
+def test_choose_balances_load_and_skips_off_shift_staff():
+    engine = make_engine(
+        staff("alice", ["Electrical"]),
+        staff("bob", ["Electrical"]),
+        staff("night", ["Electrical"], shift={"start": "22:00", "end": "06:00"})
+    )
+    assert engine.choose(issue("Electrical"), at(12))["id"] == "alice"
+    engine.record_assignment("alice")
+    assert engine.choose(issue("Electrical"), at(12))["id"] == "bob"
+    engine.record_assignment("bob")
+    # Equal loads: the current assignee keeps the issue
+    assert engine.choose(issue("Electrical"), at(12), keep="bob")["id"] == "bob"
+    assert engine.choose(issue("Electrical"), at(23))["id"] == "night"
+
+    engine.record_transition("alice", "In Progress", "Resolved")
+    assert engine.choose(issue("Electrical"), at(12))["id"] == "alice"
+
+def test_choose_returns_none_without_candidates_on_shift():
+    engine = make_engine(staff("night", ["General"], shift={"start": "22:00", "end": "06:00"}))
+    assert engine.choose(issue(), at(12)) is None
+    assert engine.stats()["no_candidate"] == 1
+
+def test_record_update_moves_load_between_assignees():
+    engine = make_engine(staff("alice", ["General"]), staff("bob", ["General"]))
+    engine.record_assignment("alice")
+    engine.record_update("alice", "bob", "Assigned", "In Progress")
+    assert (engine._load["alice"], engine._load["bob"]) == (0, 1)
+    engine.record_update("bob", "alice", "In Progress", "Resolved")
+    assert (engine._load["alice"], engine._load["bob"]) == (0, 0)
+    engine.record_update("alice", "alice", "Resolved", "In Progress")
+    assert engine._load["alice"] == 1
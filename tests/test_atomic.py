@@ -0,0 +1,35 @@
+import asyncio
+import pytest
+from utils.atomic import toggle_keyed_choice
+
+VOTE_COUNTS = {"like": "likes", "dislike": "dislikes"}
+
+def test_keyed_choice_counters_follow_each_vote():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    collection = mongomock_motor.AsyncMongoMockClient().db.menus
+
+    async def scenario():
+        await collection.insert_one({"id": "menu-1"})
+        vote = lambda member, choice: toggle_keyed_choice(
+            collection, {"id": "menu-1"}, "votes", member, choice, VOTE_COUNTS
+        )
+        # mongomock does not apply $$REMOVE to the votes map, so nobody votes
+        # again after withdrawing
+        steps = [
+            (await vote("a", "like"), 1, 0),     # counters start from missing fields
+            (await vote("b", "like"), 2, 0),
+            (await vote("a", "dislike"), 1, 1),  # switching moves the vote
+            (await vote("b", "like"), 0, 1),     # repeating a choice withdraws it
+            (await vote("a", "dislike"), 0, 0),
+        ]
+        for doc, likes, dislikes in steps:
+            assert (doc["likes"], doc["dislikes"]) == (likes, dislikes)
+        assert steps[2][0]["votes"] == {"a": "dislike", "b": "like"}
+        assert await toggle_keyed_choice(collection, {"id": "missing"}, "votes", "a", "like", VOTE_COUNTS) is None
+
+    asyncio.run(scenario())
+
+@pytest.mark.parametrize("member, choice", [("a.b", "like"), ("$a", "like"), ("", "like"), ("a", "meh")])
+def test_keyed_choice_rejects_bad_keys_and_choices(member, choice):
+    with pytest.raises(ValueError):
+        asyncio.run(toggle_keyed_choice(None, {}, "votes", member, choice, VOTE_COUNTS))
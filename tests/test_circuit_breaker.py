@@ -0,0 +1,75 @@
+import asyncio
+from types import SimpleNamespace
+import pytest
+from utils import circuit_breaker
+from utils.circuit_breaker import CircuitBreaker
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    return now
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout_seconds=30)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_request()
+    assert breaker.stats()["times_opened"] == 1
+    assert breaker.stats()["rejected_calls"] == 1
+
+def test_half_open_lets_one_trial_through(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout_seconds=30)
+    breaker.record_failure()
+    clock[0] += 30
+    assert breaker.allow_request()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request() and breaker.allow_request()
+
+def test_failed_trial_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout_seconds=30)
+    for _ in range(5):
+        breaker.record_failure()
+    clock[0] += 30
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.stats()["times_opened"] == 2
+    clock[0] += 29
+    assert not breaker.allow_request()
+
+def test_cancelled_trial_call_releases_the_trial(clock):
+    from services.ai_service import AIService
+
+    async def scenario():
+        started = asyncio.Event()
+
+        async def generate_content(model, contents):
+            started.set()
+            await asyncio.sleep(60)
+
+        service = AIService()
+        service.client = SimpleNamespace(aio=SimpleNamespace(models=SimpleNamespace(generate_content=generate_content)))
+        for _ in range(service.breaker.failure_threshold):
+            service.breaker.record_failure()
+        clock[0] += service.breaker.reset_timeout_seconds
+
+        call = asyncio.ensure_future(service._generate("hello"))
+        await started.wait()
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+        return service.breaker
+
+    breaker = asyncio.run(scenario())
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow_request()
@@ -0,0 +1,50 @@
+import asyncio
+from datetime import date
+import pytest
+from services.issue_stats import _periods, period_start, trends
+
+def test_period_start():
+    wednesday = date(2024, 1, 31)
+    assert period_start(wednesday, "day") == wednesday
+    assert period_start(wednesday, "week") == date(2024, 1, 29)
+    assert period_start(wednesday, "month") == date(2024, 1, 1)
+
+def test_week_periods_start_on_the_monday_before_start():
+    assert _periods(date(2024, 1, 31), date(2024, 2, 12), "week") == [
+        date(2024, 1, 29), date(2024, 2, 5), date(2024, 2, 12)
+    ]
+
+def test_month_periods_cross_short_months_and_years():
+    assert _periods(date(2023, 12, 15), date(2024, 3, 1), "month") == [
+        date(2023, 12, 1), date(2024, 1, 1), date(2024, 2, 1), date(2024, 3, 1)
+    ]
+    assert _periods(date(2024, 1, 31), date(2024, 1, 31), "month") == [date(2024, 1, 1)]
+
+def test_day_periods_are_inclusive():
+    assert _periods(date(2024, 2, 28), date(2024, 3, 1), "day") == [
+        date(2024, 2, 28), date(2024, 2, 29), date(2024, 3, 1)
+    ]
+
+def test_trends_fold_day_buckets_into_weeks():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    db = mongomock_motor.AsyncMongoMockClient().db
+    buckets = [
+        ("2024-01-29", "Plumbing", 2), ("2024-02-04", "Plumbing", 1),
+        ("2024-02-05", "Electrical", 4), ("2024-02-06", "Plumbing", 0)
+    ]
+
+    async def scenario():
+        await db.issue_stats.insert_many([
+            {"day": day, "category": category, "visibility": "Public", "count": count}
+            for day, category, count in buckets
+        ])
+        return await trends(db, date(2024, 1, 31), date(2024, 2, 11), "week", group_by="category")
+
+    assert asyncio.run(scenario()) == [
+        {"key": "Electrical", "total": 4, "points": [
+            {"period": "2024-01-29", "count": 0}, {"period": "2024-02-05", "count": 4}
+        ]},
+        {"key": "Plumbing", "total": 1, "points": [
+            {"period": "2024-01-29", "count": 1}, {"period": "2024-02-05", "count": 0}
+        ]}
+    ]
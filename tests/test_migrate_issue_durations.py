@@ -0,0 +1,33 @@
+from migrate_issue_durations import issue_durations
+
+def entry(old_status, new_status, timestamp):
+    return {"old_status": old_status, "new_status": new_status, "timestamp": timestamp}
+
+def test_first_response_skips_merge_entries():
+    issue = {
+        "status": "Resolved",
+        "reported_at": "2024-01-31T10:00:00+00:00",
+        "status_history": [
+            entry(None, "Reported", "2024-01-31T10:00:00+00:00"),
+            entry("Reported", "Reported", "2024-01-31T11:00:00+00:00"),
+            entry("Reported", "In Progress", "2024-01-31T12:00:00+00:00"),
+            entry("In Progress", "Resolved", "2024-01-31T16:30:00+00:00")
+        ]
+    }
+    assert issue_durations(issue) == {
+        "first_response_at": "2024-01-31T12:00:00+00:00",
+        "response_time_hours": 2.0,
+        "resolved_at": "2024-01-31T16:30:00+00:00",
+        "resolution_time_hours": 6.5
+    }
+
+def test_issues_without_a_transition_are_skipped():
+    issue = {
+        "status": "Reported",
+        "reported_at": "2024-01-31T10:00:00Z",
+        "status_history": [
+            entry(None, "Reported", "2024-01-31T10:00:00Z"),
+            entry("Reported", "Reported", "2024-01-31T11:00:00Z")
+        ]
+    }
+    assert issue_durations(issue) == {}
@@ -0,0 +1,38 @@
+import asyncio
+import pytest
+from services.notifications import build_notification, mark_read, read_state, role_audience
+
+STUDENT = {"id": "student-1", "role": "student", "hostel": "Hostel-A", "block": "Block-1"}
+
+def test_reading_in_order_moves_the_watermark_instead_of_growing_read_ids():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    db = mongomock_motor.AsyncMongoMockClient().db
+
+    async def scenario():
+        notifications = [
+            {**build_notification(role_audience("student"), "ANNOUNCEMENT", f"n{i}", ""),
+             "created_at": f"2024-01-31T10:0{i}:00+00:00"}
+            for i in range(4)
+        ]
+        await db.notifications.insert_many([dict(n) for n in notifications])
+        ids = [n["id"] for n in notifications]
+
+        # Read out of order: n2 waits behind unread n0 and n1
+        assert await mark_read(db, STUDENT, ids[2])
+        state = await read_state(db, STUDENT["id"])
+        assert state == {"read_before": None, "read_ids": {ids[2]}}
+
+        assert await mark_read(db, STUDENT, ids[0])
+        state = await read_state(db, STUDENT["id"])
+        assert state == {"read_before": notifications[0]["created_at"], "read_ids": {ids[2]}}
+
+        # Reading n1 closes the gap, so n2 is covered too
+        assert await mark_read(db, STUDENT, ids[1])
+        state = await read_state(db, STUDENT["id"])
+        assert state == {"read_before": notifications[2]["created_at"], "read_ids": set()}
+
+        assert await mark_read(db, STUDENT, ids[3])
+        assert await read_state(db, STUDENT["id"]) == {"read_before": notifications[3]["created_at"], "read_ids": set()}
+        assert not await mark_read(db, {**STUDENT, "role": "management"}, ids[3])
+
+    asyncio.run(scenario())
@@ -0,0 +1,69 @@
+import asyncio
+from datetime import datetime
+import pytest
+from fastapi import HTTPException
+from utils.pagination import decode_cursor, encode_cursor, paginate
+
+def test_cursor_round_trip():
+    doc = {"id": "b", "created_at": "2024-01-31T10:30:00+00:00"}
+    assert decode_cursor(encode_cursor(doc, "created_at", "prev")) == {
+        "k": "2024-01-31T10:30:00+00:00", "id": "b", "d": "prev"
+    }
+    cursor = encode_cursor({"id": "b", "at": datetime(2024, 1, 31, 10, 30)}, "at", "next")
+    assert "=" not in cursor
+    assert decode_cursor(cursor)["k"] == datetime(2024, 1, 31, 10, 30)
+
+@pytest.mark.parametrize("cursor", ["not a cursor", "e30", ""])
+def test_invalid_cursor_is_a_bad_request(cursor):
+    with pytest.raises(HTTPException) as error:
+        decode_cursor(cursor)
+    assert error.value.status_code == 400
+
+def make_collection(count):
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    collection = mongomock_motor.AsyncMongoMockClient().db.items
+    # Pairs of items share a timestamp so pages must break ties on id
+    docs = [{"id": f"item-{i}", "created_at": f"2024-01-{10 + i // 2:02d}", "hostel": "A"} for i in range(count)]
+    asyncio.run(collection.insert_many(docs))
+    return collection
+
+def ids(page):
+    return [doc["id"] for doc in page]
+
+def test_pages_forward_and_back_newest_first():
+    collection = make_collection(5)
+
+    async def scenario():
+        first, next_cursor, prev_cursor = await paginate(collection, {"hostel": "A"}, limit=2)
+        assert ids(first) == ["item-4", "item-3"]
+        assert prev_cursor is None
+
+        second, next_cursor, prev_cursor = await paginate(collection, {"hostel": "A"}, next_cursor, limit=2)
+        assert ids(second) == ["item-2", "item-1"]
+
+        last, end_cursor, _ = await paginate(collection, {"hostel": "A"}, next_cursor, limit=2)
+        assert ids(last) == ["item-0"]
+        assert end_cursor is None
+
+        back, forward_cursor, back_cursor = await paginate(collection, {"hostel": "A"}, prev_cursor, limit=2)
+        assert ids(back) == ["item-4", "item-3"]
+        assert back_cursor is None
+        again, _, _ = await paginate(collection, {"hostel": "A"}, forward_cursor, limit=2)
+        assert ids(again) == ids(second)
+
+    asyncio.run(scenario())
+
+def test_oldest_first_and_empty_results():
+    collection = make_collection(3)
+
+    async def scenario():
+        first, next_cursor, _ = await paginate(collection, {}, limit=2, newest_first=False)
+        assert ids(first) == ["item-0", "item-1"]
+        rest, end_cursor, prev_cursor = await paginate(collection, {}, next_cursor, limit=2, newest_first=False)
+        assert ids(rest) == ["item-2"]
+        assert end_cursor is None
+        back, _, _ = await paginate(collection, {}, prev_cursor, limit=2, newest_first=False)
+        assert ids(back) == ["item-0", "item-1"]
+        assert await paginate(collection, {"hostel": "B"}, limit=2) == ([], None, None)
+
+    asyncio.run(scenario())
@@ -0,0 +1,78 @@
+import asyncio
+from utils.result_cache import ResultCache
+from utils.ttl_cache import TTLCache
+
+def test_ttl_cache_expires_and_evicts_lru():
+    cache = TTLCache(max_size=2, ttl_seconds=30)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    cache.set("d", 4, ttl_seconds=0)
+    assert cache.get("d") is None
+    assert cache.stats()["evictions"] == 2
+
+def test_concurrent_misses_share_one_computation():
+    async def scenario():
+        cache = ResultCache()
+        calls = 0
+
+        async def compute():
+            nonlocal calls
+            calls += 1
+            await asyncio.sleep(0.01)
+            return calls
+
+        results = await asyncio.gather(*(cache.get_or_compute("k", compute) for _ in range(5)))
+        assert results == [1] * 5
+        assert await cache.get_or_compute("k", compute) == 1
+        return calls, cache.stats()
+
+    calls, stats = asyncio.run(scenario())
+    assert calls == 1
+    assert stats["coalesced"] == 4
+    assert stats["in_flight"] == 0
+
+def test_callers_after_invalidation_do_not_join_stale_computation():
+    async def scenario():
+        cache = ResultCache()
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return "stale"
+
+        async def fresh():
+            return "fresh"
+
+        waiting = asyncio.ensure_future(cache.get_or_compute("k", slow))
+        await asyncio.sleep(0)
+        cache.invalidate_all()
+        assert await asyncio.wait_for(cache.get_or_compute("k", fresh), timeout=1) == "fresh"
+        release.set()
+        # The caller that was already waiting still gets its own result ...
+        assert await waiting == "stale"
+        # ... but it is not cached over the fresh one
+        assert await cache.get_or_compute("k", slow) == "fresh"
+
+    asyncio.run(scenario())
+
+def test_failed_computation_is_not_cached():
+    async def scenario():
+        cache = ResultCache()
+
+        async def boom():
+            raise RuntimeError("down")
+
+        async def ok():
+            return 42
+
+        try:
+            await cache.get_or_compute("k", boom)
+        except RuntimeError:
+            pass
+        assert await cache.get_or_compute("k", ok) == 42
+
+    asyncio.run(scenario())
@@ -0,0 +1,66 @@
+from services.similarity import SimilarityIndex
+
+def make_issue(issue_id, title, status="Reported", category="Plumbing", block="Block-1", **fields):
+    return {
+        "id": issue_id,
+        "ticket_id": f"HST-{issue_id}",
+        "title": title,
+        "description": "",
+        "category": category,
+        "status": status,
+        "visibility": "Public",
+        "reporter_id": "student-1",
+        "location": {"hostel": "Hostel-A", "block": block},
+        **fields
+    }
+
+TAP = "Tap leaking in bathroom, water everywhere"
+
+def test_finds_similar_issues_in_same_partition_only():
+    index = SimilarityIndex()
+    index.add(make_issue("1", TAP))
+    index.add(make_issue("2", "Tap leaking in bathroom, water on floor"))
+    index.add(make_issue("3", TAP, block="Block-2"))
+    index.add(make_issue("4", "Fan not working, makes noise"))
+
+    results = index.find_similar(make_issue(None, TAP))
+    assert [r["id"] for r in results] == ["1", "2"]
+    assert results[0]["similarity"] == 1.0
+    assert index.find_similar(index.get("1"), exclude_id="1")[0]["id"] == "2"
+
+def test_students_only_see_public_and_own_issues():
+    index = SimilarityIndex()
+    index.add(make_issue("1", TAP, visibility="Private"))
+    index.add(make_issue("2", TAP, visibility="Private", reporter_id="student-2"))
+
+    viewer = {"id": "student-2", "role": "student"}
+    assert [r["id"] for r in index.find_similar(make_issue(None, TAP), viewer=viewer)] == ["2"]
+    manager = {"id": "staff-1", "role": "management"}
+    assert len(index.find_similar(make_issue(None, TAP), viewer=manager)) == 2
+
+def test_closing_while_recategorizing_removes_stale_entry():
+    index = SimilarityIndex()
+    index.add(make_issue("1", TAP))
+    index.add(make_issue("1", TAP, status="Closed", category="Electrical"))
+
+    assert index.get("1") is None
+    assert index.find_similar(make_issue(None, TAP)) == []
+    assert index.stats()["indexed_issues"] == 0
+
+def test_resolved_and_duplicate_issues_leave_index_until_reopened():
+    index = SimilarityIndex()
+    index.add(make_issue("1", TAP))
+    index.add(make_issue("2", TAP))
+    index.add(make_issue("1", TAP, status="Resolved"))
+    index.add(make_issue("2", TAP, is_duplicate=True))
+    assert index.find_similar(make_issue(None, TAP)) == []
+
+    index.add(make_issue("1", TAP, status="In Progress"))
+    assert [r["status"] for r in index.find_similar(make_issue(None, TAP))] == ["In Progress"]
+
+def test_remove_drops_empty_buckets():
+    index = SimilarityIndex()
+    index.add(make_issue("1", TAP))
+    index.remove("1")
+    index.remove("1")
+    assert all(not band for band in index._buckets[index.partition_of(make_issue("1", TAP))])